@@ -12,66 +12,466 @@ Usage: python main.py
 """
 
 import mysql.connector
+from mysql.connector.pooling import MySQLConnectionPool
 from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from operator import itemgetter
+import argparse
+import atexit
+import csv
+import gc
+import glob
+import gzip
 import os
-import pandas as pd
 from datetime import datetime
+from functools import lru_cache
+from itertools import chain, islice
 import sys
+import time
 import re
-from html import unescape
+from selectolax.lexbor import LexborHTMLParser
 
 # Load environment variables
 load_dotenv()
 
+# Product images are served from the CDN as <idimage>.<ext>
+CDN_IMAGE_URL = 'https://cdn.bazarchic.com/i/tmp/{}.{}'
+GALLERY_SIZE = 10
+EMPTY_GALLERY = ('',) * GALLERY_SIZE
+
+# Rows pulled from the server per fetchmany() call while streaming exports
+FETCH_SIZE = 1000
+
+# Write buffer for CSV output files (fewer, larger write syscalls)
+CSV_BUFFER_SIZE = 1 << 20
+
+# gzip level for compressed exports: most of the size reduction of level 9
+# at a fraction of the CPU cost
+GZIP_LEVEL = 3
+
+# Parquet output of the comprehensive export (pyarrow, optional): rows per
+# row group and zstd level
+PARQUET_ROW_GROUP_SIZE = 128 * 1024
+PARQUET_ZSTD_LEVEL = 3
+
+# Exports are written under <filename>.part and renamed once complete
+PARTIAL_SUFFIX = '.part'
+
+# Menu input history, kept between interactive sessions when readline exists
+HISTORY_FILE = os.path.expanduser('~/.pythondb_bazarchic_history')
+
+# Maximum number of ids sent in a single IN (...) clause
+IN_CLAUSE_BATCH_SIZE = 1000
+
+# EANs from a file are searched and loaded into the export filter this many
+# at a time, so neither statement size nor result size grows with the file
+EAN_CHUNK_SIZE = max(int(os.getenv('EAN_CHUNK_SIZE', 1000)), 1)
+
+# Pooled connections: one serves the main queries, one streams the
+# comprehensive export and the rest run batched characteristic/gallery lookups
+# in parallel threads (at least 3 so a streamed export always has a lookup slot).
+# The pool gets POOL_SPARE_CONNECTIONS more so that a connection still being
+# handed back never starves the lookups (MySQLConnectionPool allows 32 at most).
+POOL_SPARE_CONNECTIONS = 2
+DB_POOL_SIZE = min(max(int(os.getenv('DB_POOL_SIZE', 4)), 3), 32 - POOL_SPARE_CONNECTIONS)
+LOOKUP_WORKERS = DB_POOL_SIZE - 2
+
+# Connection settings, read from the environment once at startup
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST'),
+    'user': os.getenv('DB_USER'),
+    'password': os.getenv('DB_PASSWORD'),
+    'database': os.getenv('DB_NAME'),
+    'port': int(os.getenv('DB_PORT', 3306)),
+    'charset': 'utf8mb4',
+    'use_unicode': True,
+    # zlib protocol compression: exports are mostly long text columns, so the
+    # wire is the bottleneck. Set DB_COMPRESS=0 for a local server.
+    'compress': os.getenv('DB_COMPRESS', '1') != '0',
+}
+
+# Active characteristics of a product group with their key (dk) and value (dv)
+# dictionary entries; shared by the single-product and batched lookups
+CHARACTERISTICS_FROM = """
+FROM produits_group_caracteristiques pgc
+JOIN caracteristiques c ON pgc.idcaracteristique = c.idcaracteristique
+JOIN dictionnaires_langues dk ON c.iddictionnaire_cle = dk.iddictionnaire
+JOIN dictionnaires_langues dv ON c.iddictionnaire_valeur = dv.iddictionnaire
+"""
+
+# Header row of the comprehensive export, in column order
+COMPREHENSIVE_HEADERS = (
+    'Category', 'Shop sku', 'Titre du produit', 'Marque', 'Description Longue',
+    'EAN', 'Couleur commercial', 'Image principale', 'image secondaire',
+    'Image 3', 'Image 4', 'Image 5', 'Image 6', 'Image 7', 'Image 8',
+    'Image 9', 'Image_10', 'Produit Parent (identification)', 'Id de rattachement',
+    'Composition 1', 'Composition 2', 'Composition 3', 'Conseil d\'entretien',
+    'Capacité', 'Dimensions', 'DLC (Date limite de consommation)',
+    'DDM (Date de durabilité minimale)', 'Ingrédients', 'Poids net du produit',
+    'Motif', 'Garantie commerciale', 'Eco-responsable', 'Métrage ? (oui /non)',
+    'Produit ou Service', 'BZC ( à ne pas remplir )', 'Poids du colis (kg)', 'Taille unique'
+)
+
+# Second header row: the marketplace field name of each column
+COMPREHENSIVE_TECHNICAL_NAMES = (
+    'family_id', 'shop_sku', 'name', 'brand_id', 'description',
+    'ean', 'technical_spec_1_color', 'media_1', 'media_2',
+    'media_3', 'media_4', 'media_5', 'media_6', 'media_7', 'media_8',
+    'media_9', 'media_10', 'is_parent', 'variant_group_code',
+    'technical_spec_1_composition', 'technical_spec_2_composition', 'technical_spec_3_composition', 'technical_spec_1_care_advice',
+    'technical_spec_1_capacity', 'technical_spec_1_dimensions', 'technical_spec_1_expiration_date',
+    'technical_spec_1_durability_date', 'technical_spec_1_ingredients', 'technical_spec_1_net_weight',
+    'technical_spec_1_pattern', 'technical_spec_1_commercial_warranty', 'technical_spec_1_eco_responsibility', 'is_cloth',
+    'is_virtual', 'is_bzc', 'weight', 'size_id'
+)
+COMPREHENSIVE_EAN_COLUMN = COMPREHENSIVE_HEADERS.index('EAN')
+
+# Columns of the comprehensive export query read by Python to build each row
+PRODUCT_FIELD_COLUMNS = ('Description Longue', 'EAN', 'product_group_id', 'product_name_for_capacity', 'virtuel')
+
+# Columns copied unchanged from the comprehensive export query into each CSV
+# row, fetched with one C-level call per group of adjacent columns
+PRODUCT_HEAD_COLUMNS = ('Shop sku', 'Titre du produit', 'Marque')
+PRODUCT_TAIL_COLUMNS = ('Poids du colis (kg)', 'Taille unique')
+
+# Product groups whose characteristics are kept in memory between lookups
+CHARACTERISTICS_CACHE_SIZE = 100_000
+
+# Product names whose capacity is kept in memory between rows
+CAPACITY_CACHE_SIZE = 100_000
+
+# Conditions on the characteristic key (dk) and value (dv) dictionaries that
+# select each technical field, as used by the get_*_from_product queries
+CHARACTERISTIC_CONDITIONS = {
+    'capacity': """(dk.valeur LIKE '%capacité%' OR dk.valeur LIKE '%capacity%' OR
+                    dk.valeur LIKE '%volume%' OR dk.valeur LIKE '%contenance%')
+                   AND dv.valeur != ''""",
+    'dlc': "dk.valeur LIKE '%DLC%'",
+    'ddm': "(dk.valeur LIKE '%DDM%' OR dk.valeur LIKE '%durabilité%')",
+    'ingredients': """(dk.valeur = 'Ingrédients' OR dk.valeur = 'Ingredients' OR
+                       dk.valeur LIKE '%ngrédient%' OR dk.valeur LIKE '%ngredient%')
+                      AND LENGTH(dv.valeur) > 20""",
+    'weight': "dk.valeur LIKE '%Poids%'",
+    'dimensions': "dk.valeur LIKE '%Dimensions%'",
+    'motif': "dk.valeur LIKE '%Motif%'",
+    'color': "(dk.valeur = 'Couleurs' OR dk.valeur = 'Couleur') AND LENGTH(dv.valeur) > 20",
+    'care_advice': "dk.valeur = 'Conseil d''entretien' AND LENGTH(dv.valeur) > 10",
+    'composition': "dk.valeur LIKE '%Composition%' AND LENGTH(dv.valeur) > 5",
+}
+
+# Free-text fields whose whitespace is collapsed, capped at this many characters
+CHARACTERISTIC_MAX_LENGTHS = {
+    'ingredients': 1000,
+    'color': 500,
+    'care_advice': 500,
+    'composition': 200,
+}
+
+# Fields that can take several values, and how many of them the export keeps
+CHARACTERISTIC_MULTI_VALUES = {'composition': 3}
+
+# Indexes the export and characteristic queries rely on, as
+# (table, leading column, DDL to create it). Checked once at startup.
+RECOMMENDED_INDEXES = [
+    ('produits', 'status',
+     'ALTER TABLE produits ADD INDEX idx_status_id (status, idproduit)'),
+    ('produits_group_caracteristiques', 'idproduit_group',
+     'ALTER TABLE produits_group_caracteristiques ADD INDEX idx_group_status (idproduit_group, status)'),
+    ('produits', 'ean',
+     'ALTER TABLE produits ADD INDEX idx_ean (ean)'),
+    ('produits_gallery', 'idproduit_group',
+     'ALTER TABLE produits_gallery ADD INDEX idx_group_status_pos (idproduit_group, status, position, idimage, ext)'),
+    ('dictionnaires_langues', 'iddictionnaire',
+     'ALTER TABLE dictionnaires_langues ADD INDEX idx_dict_valeur (iddictionnaire, valeur(64))'),
+]
+
+# Compiled once at import, reused for every description cell
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Shape of an EAN-8, UPC-A, EAN-13 or GTIN-14 code (matched with fullmatch)
+EAN_RE = re.compile(r'\d{8}|\d{12,14}')
+
+# Free-text capacity / durability / expiration mentions. Each field is a single
+# alternation with one named group per unit, so the text is scanned only once.
+CAPACITY_RE = re.compile(
+    r'(?P<ml>\d+(?:\.\d+)?)\s*ml'
+    r'|(?P<l>\d+(?:\.\d+)?)\s*l(?:\s|$|\.)'
+    r'|(?P<cl>\d+(?:\.\d+)?)\s*cl'
+    r'|(?P<litre>\d+(?:\.\d+)?)\s*litre',
+    re.IGNORECASE
+)
+CAPACITY_UNITS = {'ml': 'ml', 'l': 'L', 'cl': 'cl', 'litre': 'L'}
+
+DDM_RE = re.compile(
+    r'(?P<mois>\d+)\s*mois'
+    r'|(?P<ans>\d+)\s*(?:ans?|année)'
+    r'|durabilité[^\d]*(?P<durabilite>\d+)'
+    r'|conservation[^\d]*(?P<conservation>\d+)',
+    re.IGNORECASE
+)
+DDM_UNITS = {'mois': 'mois', 'ans': 'ans', 'durabilite': 'mois', 'conservation': 'mois'}
+
+DLC_RE = re.compile(
+    r'date limite[^\d]*(?P<date_limite>\d+)'
+    r'|expire[^\d]*(?P<expire>\d+)'
+    r'|péremption[^\d]*(?P<peremption>\d+)',
+    re.IGNORECASE
+)
+
 def clean_html(text):
     """Remove HTML tags and decode HTML entities from text"""
     if not text or text.strip() == '':
         return ''
     
-    # Remove HTML tags
-    clean_text = re.sub(r'<[^>]+>', '', str(text))
+    text = str(text)
+    
+    # Plain-text cells (the majority) have nothing to strip or decode
+    if '<' not in text and '&' not in text:
+        return ' '.join(text.split())
     
-    # Decode HTML entities (like &amp;, &lt;, &gt;, etc.)
-    clean_text = unescape(clean_text)
+    # Strip tags and decode entities (like &amp;, &lt;, &gt;, etc.) with the
+    # native lexbor parser, which also copes with malformed markup. Script and
+    # style blocks are dropped with their content rather than kept as text.
+    tree = LexborHTMLParser(text)
+    tree.strip_tags(['script', 'style'])
+    clean_text = tree.text()
     
     # Clean up extra whitespace
-    clean_text = ' '.join(clean_text.split())
+    clean_text = WHITESPACE_RE.sub(' ', clean_text)
     
     return clean_text.strip()
 
+def open_csv_output(filename, compress=False, append=False):
+    """Open an export file for csv writing, gzip-compressed when compress is set"""
+    mode = 'a' if append else 'w'
+    if compress:
+        return gzip.open(filename, mode + 't', compresslevel=GZIP_LEVEL, encoding='utf-8', newline='')
+    return open(filename, mode, encoding='utf-8', newline='', buffering=CSV_BUFFER_SIZE)
+
+def comprehensive_row_getters(column_names):
+    """Positional getters for the tuple rows of the comprehensive export query
+    
+    Returns the index of product_group_id and one itemgetter each for
+    PRODUCT_FIELD_COLUMNS, PRODUCT_HEAD_COLUMNS and PRODUCT_TAIL_COLUMNS,
+    resolved from the cursor's column_names."""
+    index = {name: i for i, name in enumerate(column_names)}
+    return (index['product_group_id'], *(
+        itemgetter(*(index[name] for name in names))
+        for names in (PRODUCT_FIELD_COLUMNS, PRODUCT_HEAD_COLUMNS, PRODUCT_TAIL_COLUMNS)
+    ))
+
+def prefetch_batches(cursor, size):
+    """Yield cursor.fetchmany(size) batches until the result set is exhausted
+    
+    The next batch is fetched in a background thread while the caller is still
+    processing the current one, so MySQL round-trips overlap with cleaning,
+    enrichment and CSV writing."""
+    with ThreadPoolExecutor(max_workers=1) as prefetcher:
+        pending = prefetcher.submit(cursor.fetchmany, size)
+        while True:
+            batch = pending.result()
+            if not batch:
+                return
+            pending = prefetcher.submit(cursor.fetchmany, size)
+            yield batch
+
+@contextmanager
+def paused_gc():
+    """Pause the cyclic garbage collector for the duration of a streamed export
+    
+    Export rows make no cyclic garbage, so the collector would only re-scan the
+    young rows of every batch. It is re-enabled on exit, also after a failure,
+    and one collection then clears whatever the export left behind."""
+    gc.disable()
+    try:
+        yield
+    finally:
+        gc.enable()
+        gc.collect()
+
+def close_streaming_cursor(connection, cursor):
+    """Close an unbuffered cursor, first reading off any rows an aborted stream
+    left pending so the connection stays usable; a failure here is reported,
+    never raised over the error that aborted the stream"""
+    try:
+        if connection.unread_result:
+            connection.consume_results()
+        cursor.close()
+    except mysql.connector.Error as e:
+        print(f"⚠️ Could not release the streamed result: {e}")
+
+def publish_output(filename):
+    """Move a finished export from its PARTIAL_SUFFIX working file to filename
+    
+    The data is fsynced once and then renamed atomically, so a file under its
+    final name is always complete."""
+    partial = filename + PARTIAL_SUFFIX
+    fd = os.open(partial, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(partial, filename)
+
+class ProgressLine:
+    """Progress of a long export on a single console line, rewritten in place
+    at most every interval seconds (one line per update when not a terminal)"""
+    
+    def __init__(self, unit, initial=0, interval=0.5):
+        self.unit = unit
+        self.initial = initial
+        self.count = initial
+        self.interval = interval
+        self.start = self.last = time.monotonic()
+        self.in_place = sys.stdout.isatty()
+    
+    def update(self, count, force=False):
+        self.count = count
+        now = time.monotonic()
+        if not force and now - self.last < self.interval:
+            return
+        self.last = now
+        elapsed = now - self.start
+        rate = (count - self.initial) / elapsed if elapsed else 0
+        line = f"📄 Progress: {count:,} {self.unit} exported ({elapsed:.1f}s, {rate:,.0f} {self.unit}/s)"
+        sys.stdout.write(f"\r{line}" if self.in_place else f"{line}\n")
+        sys.stdout.flush()
+    
+    def finish(self):
+        """Show the final count and end the line"""
+        self.update(self.count, force=True)
+        if self.in_place:
+            sys.stdout.write("\n")
+
+def write_checkpoint(path, last_id, rows_written, file_offset):
+    """Atomically record how far an export got: last product id written, rows
+    written and the CSV size at that point"""
+    with open(path + '.tmp', 'w') as f:
+        f.write(f"{last_id},{rows_written},{file_offset}")
+    os.replace(path + '.tmp', path)
+
+def read_checkpoint(path):
+    """Read back (last_id, rows_written, file_offset) saved by write_checkpoint"""
+    with open(path) as f:
+        return tuple(int(value) for value in f.read().split(','))
+
+def read_ean_file(path):
+    """Yield the EAN codes of a text file, one per non-blank line, as the file
+    is read rather than loading it whole"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            ean = line.strip()
+            if ean:
+                yield ean
+
+def filter_valid_eans(eans, rejected):
+    """Yield the codes of eans that have the shape of an EAN (EAN_RE); the
+    others are appended to rejected, blank ones are dropped silently"""
+    for ean in eans:
+        if EAN_RE.fullmatch(ean):
+            yield ean
+        elif ean:
+            rejected.append(ean)
+
+def peek_iterable(iterable):
+    """Return an iterator over iterable, or None when it yields nothing (only
+    the first item is consumed to find out)"""
+    iterator = iter(iterable)
+    for first in iterator:
+        return chain((first,), iterator)
+    return None
+
+def extract_capacity(text):
+    """Extract the first capacity (ml, cl, L) mentioned in text"""
+    if not text:
+        return ""
+    
+    # First capacity like "30 ml", "50ml", "1.5 L", etc. in a single scan
+    match = CAPACITY_RE.search(text)
+    if not match:
+        return ""
+    
+    unit = match.lastgroup
+    return f"{match.group(unit)} {CAPACITY_UNITS[unit]}"
+
+# Product names repeat across the variants of a group, so their capacity is
+# memoised; descriptions are long and mostly unique and are not
+extract_capacity_from_name = lru_cache(maxsize=CAPACITY_CACHE_SIZE)(extract_capacity)
+
+def clean_characteristic(field, text):
+    """Collapse whitespace in a free-text characteristic and cap its length as
+    set in CHARACTERISTIC_MAX_LENGTHS; other fields are returned unchanged"""
+    max_length = CHARACTERISTIC_MAX_LENGTHS.get(field)
+    if not max_length or not text:
+        return text
+    text = WHITESPACE_RE.sub(' ', text)
+    if len(text) > max_length:
+        text = text[:max_length] + "..."
+    return text
+
 class BazarchicDB:
     """Bazarchic Database Connection and Operations"""
     
     def __init__(self):
+        self.pool = None
         self.connection = None
+        self.characteristics_cache = {}
         self.connect()
     
     def connect(self):
-        """Connect to MySQL database"""
+        """Connect to MySQL database through a connection pool"""
         try:
-            self.connection = mysql.connector.connect(
-                host=os.getenv('DB_HOST'),
-                user=os.getenv('DB_USER'),
-                password=os.getenv('DB_PASSWORD'),
-                database=os.getenv('DB_NAME'),
-                port=int(os.getenv('DB_PORT', 3306))
+            self.pool = MySQLConnectionPool(
+                pool_name='bazarchic',
+                pool_size=DB_POOL_SIZE + POOL_SPARE_CONNECTIONS,
+                pool_reset_session=False,
+                **DB_CONFIG
             )
+            self.connection = self.pool.get_connection()
             
             if self.connection.is_connected():
-                print(f"✅ Connected to database: {os.getenv('DB_NAME')}")
+                print(f"✅ Connected to database: {DB_CONFIG['database']}")
+                self.check_recommended_indexes()
                 return True
         except mysql.connector.Error as e:
             print(f"❌ Database connection failed: {e}")
             return False
     
+    def check_recommended_indexes(self):
+        """Warn about missing indexes that turn export lookups into full scans"""
+        try:
+            cursor = self.connection.cursor()
+            tables = sorted({table for table, _, _ in RECOMMENDED_INDEXES})
+            placeholders = ', '.join(['%s'] * len(tables))
+            cursor.execute(f"""
+                SELECT DISTINCT TABLE_NAME, COLUMN_NAME
+                FROM information_schema.STATISTICS
+                WHERE TABLE_SCHEMA = DATABASE()
+                  AND SEQ_IN_INDEX = 1
+                  AND TABLE_NAME IN ({placeholders})
+            """, tables)
+            indexed = set(cursor.fetchall())
+            cursor.close()
+            
+            for table, column, ddl in RECOMMENDED_INDEXES:
+                if (table, column) not in indexed:
+                    print(f"⚠️  No index on {table}({column}); exports will scan the table. Suggested:")
+                    print(f"   {ddl};")
+        except mysql.connector.Error as e:
+            print(f"⚠️  Could not check indexes: {e}")
+    
     def close(self):
         """Close database connection"""
         if self.connection and self.connection.is_connected():
             self.connection.close()
             print("🔌 Database connection closed")
     
-    def list_all_tables(self):
-        """List all tables in the database"""
+    def list_all_tables(self, limit=None, interactive=False):
+        """List all tables in the database
+        
+        Prints the first limit table names (all by default). With interactive=True
+        the listing pauses every 20 tables and asks whether to continue."""
         try:
             cursor = self.connection.cursor()
             cursor.execute("SHOW TABLES")
@@ -80,10 +480,16 @@ class BazarchicDB:
             print(f"\n📋 Database Tables ({len(tables)} total):")
             print("=" * 60)
             
-            for i, table in enumerate(tables, 1):
-                print(f"{i:3d}. {table[0]}")
-                if i % 20 == 0:  # Pause every 20 tables
-                    continue_view = input(f"\nShowing {i}/{len(tables)} tables. Continue? (y/n): ")
+            shown = tables[:limit] if limit else tables
+            # Paging needs someone to answer; piped input would block or run dry
+            interactive = interactive and sys.stdin.isatty()
+            page_size = 20 if interactive else len(shown)
+            for start in range(0, len(shown), page_size or 1):
+                page = shown[start:start + page_size]
+                sys.stdout.write(''.join(f"{i:3d}. {table[0]}\n" for i, table in enumerate(page, start + 1)))
+                end = start + len(page)
+                if interactive and end < len(shown):
+                    continue_view = input(f"\nShowing {end}/{len(tables)} tables. Continue? (y/n): ")
                     if continue_view.lower() != 'y':
                         print("...")
                         break
@@ -105,16 +511,15 @@ class BazarchicDB:
             cursor.execute("DESCRIBE produits_view3")
             columns_info = cursor.fetchall()
             
-            # Get row count
-            cursor.execute("SELECT COUNT(*) as total FROM produits_view3")
-            total_count = cursor.fetchone()['total']
-            
-            # Get EAN statistics
+            # Get row count and EAN statistics in a single scan
             cursor.execute("""
-                SELECT COUNT(*) as total FROM produits_view3 
-                WHERE ean IS NOT NULL AND ean != '' AND TRIM(ean) != ''
+                SELECT COUNT(*) as total,
+                       COALESCE(SUM(ean IS NOT NULL AND ean != '' AND TRIM(ean) != ''), 0) as ean_total
+                FROM produits_view3
             """)
-            ean_count = cursor.fetchone()['total']
+            counts = cursor.fetchone()
+            total_count = counts['total']
+            ean_count = int(counts['ean_total'])
             
             # Get sample data
             cursor.execute("SELECT * FROM produits_view3 LIMIT 3")
@@ -155,71 +560,114 @@ class BazarchicDB:
             print(f"❌ Error getting products info: {e}")
             return None
     
-    def export_all_products_csv(self, batch_size=10000, max_products=None):
-        """Export all products to CSV with batch processing"""
+    def export_all_products_csv(self, batch_size=10000, max_products=None, compress=False, resume_from=None):
+        """Export all products to CSV, streaming rows from a single query
+        
+        Rows are fetched FETCH_SIZE at a time; progress is printed every batch_size rows.
+        With compress=True the CSV is gzip-compressed as it is written (.csv.gz).
+        Uncompressed full exports (no max_products) save a checkpoint (<file>.ckpt)
+        every batch_size rows; pass the CSV filename as resume_from to continue an
+        interrupted export."""
         try:
-            cursor = self.connection.cursor(dictionary=True)
-            
-            # Get total count
-            cursor.execute("SELECT COUNT(*) as total FROM produits_view3 WHERE status = 'on'")
-            total_count = cursor.fetchone()['total']
-            
-            if max_products and max_products < total_count:
-                total_count = max_products
-            
+            # No COUNT(*) pre-pass over the view: progress reports the running
+            # row count, elapsed time and rate instead of a percentage
             print(f"\n📊 Exporting Products to CSV:")
             print("=" * 40)
-            print(f"Total products to export: {total_count:,}")
+            if max_products:
+                print(f"Max products to export: {max_products:,}")
             print(f"Batch size: {batch_size:,}")
+            start_time = time.perf_counter()
             
-            filename = f"all_products_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            
-            # Export in batches
-            offset = 0
+            last_id = 0
             total_exported = 0
-            first_batch = True
             
-            while offset < total_count:
-                current_batch_size = min(batch_size, total_count - offset)
-                if max_products:
-                    current_batch_size = min(current_batch_size, max_products - total_exported)
-                
-                query = f"SELECT * FROM produits_view3 WHERE status = 'on' LIMIT {current_batch_size} OFFSET {offset}"
-                cursor.execute(query)
-                products = cursor.fetchall()
-                
-                if not products:
-                    break
-                
-                df = pd.DataFrame(products)
-                
-                # Clean HTML from description fields if they exist
-                for col in df.columns:
-                    if 'description' in col.lower():
-                        df[col] = df[col].apply(clean_html)
-                
-                if first_batch:
-                    df.to_csv(filename, index=False, encoding='utf-8')
-                    first_batch = False
-                else:
-                    df.to_csv(filename, mode='a', header=False, index=False, encoding='utf-8')
-                
-                total_exported += len(products)
-                offset += batch_size
-                
-                progress = (total_exported / total_count) * 100
-                print(f"📄 Progress: {total_exported:,}/{total_count:,} ({progress:.1f}%)")
-                
-                if max_products and total_exported >= max_products:
-                    break
-            
-            cursor.close()
+            if resume_from:
+                # Drop any rows written after the last checkpoint, then append
+                filename = resume_from
+                last_id, total_exported, file_offset = read_checkpoint(filename + '.ckpt')
+                os.truncate(filename + PARTIAL_SUFFIX, file_offset)
+                compress = False
+                print(f"↩️  Resuming {filename} after product {last_id} ({total_exported:,} already exported)")
+            else:
+                filename = f"all_products_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+                if compress:
+                    filename += '.gz'
+            checkpoint = filename + '.ckpt'
+            
+            # Scan the view once with an unbuffered cursor: rows are streamed from
+            # the server batch by batch instead of re-scanning past an OFFSET.
+            # Ordering by idproduit lets an interrupted export resume by key.
+            query = "SELECT * FROM produits_view3 WHERE status = 'on' AND idproduit > %s ORDER BY idproduit"
+            params = [last_id]
+            if max_products:
+                query += " LIMIT %s"
+                params.append(max(max_products - total_exported, 0))
+            
+            cursor = self.connection.cursor(buffered=False)
+            try:
+                cursor.execute(query, params)
+                
+                progress = ProgressLine('rows', initial=total_exported)
+                next_checkpoint = (total_exported // batch_size + 1) * batch_size
+                
+                # Rows stay plain tuples and go to the C csv writer as-is; only the
+                # description columns are rewritten
+                fieldnames = list(cursor.column_names)
+                id_idx = fieldnames.index('idproduit')
+                description_idx = [i for i, col in enumerate(fieldnames) if 'description' in col.lower()]
+                
+                partial = filename + PARTIAL_SUFFIX
+                with open_csv_output(partial, compress, append=bool(resume_from)) as f:
+                    writer = csv.writer(f)
+                    if not resume_from:
+                        writer.writerow(fieldnames)
+                    
+                    for products in prefetch_batches(cursor, FETCH_SIZE):
+                        # Clean HTML from description fields if they exist
+                        if description_idx:
+                            products = [list(product) for product in products]
+                            for product in products:
+                                for i in description_idx:
+                                    product[i] = clean_html(product[i])
+                        
+                        writer.writerows(products)
+                        
+                        total_exported += len(products)
+                        progress.update(total_exported)
+                        
+                        # Checkpoint once per batch_size rows rather than on every fetch
+                        if total_exported >= next_checkpoint:
+                            next_checkpoint = (total_exported // batch_size + 1) * batch_size
+                            
+                            # A gzip stream cannot be cut and appended to, so only
+                            # plain CSV exports are checkpointed. A capped sample is
+                            # not either: it must not be offered to resume the full
+                            # export under the same all_products_* name.
+                            if not compress and not max_products:
+                                f.flush()
+                                os.fsync(f.fileno())
+                                # The written pages are clean now and never re-read:
+                                # let the kernel drop them instead of growing the
+                                # page cache for the whole export (Linux only)
+                                if hasattr(os, 'posix_fadvise'):
+                                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+                                write_checkpoint(checkpoint, products[-1][id_idx], total_exported,
+                                                 os.path.getsize(partial))
+                progress.finish()
+            finally:
+                # Also after a failure, so self.connection is left usable
+                close_streaming_cursor(self.connection, cursor)
+            
+            publish_output(filename)
+            if os.path.exists(checkpoint):
+                os.remove(checkpoint)
             
             file_size = os.path.getsize(filename) / 1024 / 1024
             print(f"\n✅ Export completed!")
             print(f"📁 File: {filename}")
             print(f"📊 Products exported: {total_exported:,}")
             print(f"💾 File size: {file_size:.2f} MB")
+            print(f"⏱️  Elapsed: {time.perf_counter() - start_time:.1f}s")
             
             return filename, total_exported
             
@@ -228,121 +676,63 @@ class BazarchicDB:
             return None, 0
     
     def extract_capacity_from_text(self, text):
-        """Extract capacity from text (ml, l, g, kg, etc.)"""
-        if not text:
-            return ""
-        
-        import re
-        # Pattern to match capacity like "30 ml", "50ml", "1.5 L", etc.
-        capacity_patterns = [
-            r'(\d+(?:\.\d+)?)\s*ml',
-            r'(\d+(?:\.\d+)?)\s*l(?:\s|$|\.)',
-            r'(\d+(?:\.\d+)?)\s*cl',
-            r'(\d+(?:\.\d+)?)\s*litre',
-        ]
-        
-        text_lower = text.lower()
-        for pattern in capacity_patterns:
-            matches = re.findall(pattern, text_lower)
-            if matches:
-                # Return the first match with appropriate unit
-                value = matches[0]
-                if 'ml' in pattern:
-                    return f"{value} ml"
-                elif any(unit in pattern for unit in ['l', 'litre']):
-                    return f"{value} L"
-                elif 'cl' in pattern:
-                    return f"{value} cl"
-        
-        return ""
+        """Extract capacity from text (ml, cl, L)"""
+        return extract_capacity(text)
     
     def extract_expiration_info(self, text):
         """Extract expiration/durability information from text"""
         if not text:
             return "", ""
         
-        import re
-        text_lower = text.lower()
-        
-        # Patterns for durability (DDM)
-        ddm_patterns = [
-            r'(\d+)\s*mois',
-            r'(\d+)\s*ans?',
-            r'(\d+)\s*année',
-            r'durabilité[^\d]*(\d+)',
-            r'conservation[^\d]*(\d+)',
-        ]
-        
-        # Patterns for expiration (DLC)  
-        dlc_patterns = [
-            r'date limite[^\d]*(\d+)',
-            r'expire[^\d]*(\d+)',
-            r'péremption[^\d]*(\d+)'
-        ]
-        
         dlc = ""
         ddm = ""
         
         # Check for DDM
-        for pattern in ddm_patterns:
-            matches = re.findall(pattern, text_lower)
-            if matches:
-                value = matches[0]
-                if 'mois' in pattern:
-                    ddm = f"{value} mois"
-                elif any(word in pattern for word in ['ans', 'année']):
-                    ddm = f"{value} ans" 
-                else:
-                    ddm = f"{value} mois"  # Default to months
-                break
+        match = DDM_RE.search(text)
+        if match:
+            unit = match.lastgroup
+            ddm = f"{match.group(unit)} {DDM_UNITS[unit]}"
         
         # Check for DLC
-        for pattern in dlc_patterns:
-            matches = re.findall(pattern, text_lower)
-            if matches:
-                dlc = f"{matches[0]} jours"
-                break
+        match = DLC_RE.search(text)
+        if match:
+            dlc = f"{match.group(match.lastgroup)} jours"
         
         return dlc, ddm
 
+    def _get_characteristic(self, product_data, field, position=1):
+        """Get the position-th value (by characteristic position) of a
+        CHARACTERISTIC_CONDITIONS field for the product's group, cleaned with
+        clean_characteristic, or "" when there is none"""
+        product_group_id = product_data.get('product_group_id')
+        if not product_group_id:
+            return ""
+        
+        query = f"""
+        SELECT dv.valeur
+        {CHARACTERISTICS_FROM}
+        WHERE pgc.idproduit_group = %s
+          AND pgc.status = 'on'
+          AND c.status = 'on'
+          AND ({CHARACTERISTIC_CONDITIONS[field]})
+        ORDER BY pgc.position
+        LIMIT %s
+        """
+        
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(query, (int(product_group_id), position))
+            results = cursor.fetchall()
+            if len(results) >= position and results[position - 1][0]:
+                return clean_characteristic(field, results[position - 1][0].strip())
+            return ""
+        finally:
+            cursor.close()
+
     def get_capacity_from_product(self, product_data):
         """Extract capacity from product data using database characteristics"""
         try:
-            product_group_id = product_data.get('product_group_id')
-            if not product_group_id:
-                return ""
-            
-            cursor = self.connection.cursor()
-            
-            # Query for capacity from characteristics table
-            query = """
-            SELECT dv.valeur as capacity_value
-            FROM produits_group_caracteristiques pgc
-            JOIN caracteristiques c ON pgc.idcaracteristique = c.idcaracteristique
-            JOIN dictionnaires_langues dk ON c.iddictionnaire_cle = dk.iddictionnaire
-            JOIN dictionnaires_langues dv ON c.iddictionnaire_valeur = dv.iddictionnaire
-            WHERE pgc.idproduit_group = %s
-              AND pgc.status = 'on'
-              AND c.status = 'on'
-              AND (dk.valeur LIKE '%capacité%' OR dk.valeur LIKE '%capacity%' OR 
-                   dk.valeur LIKE '%volume%' OR dk.valeur LIKE '%contenance%')
-              AND dv.valeur IS NOT NULL
-              AND dv.valeur != ''
-            ORDER BY pgc.position
-            LIMIT 1
-            """
-            
-            cursor.execute(query, (product_group_id,))
-            result = cursor.fetchone()
-            
-            if result and result[0]:
-                capacity_value = result[0].strip()
-                cursor.close()
-                return capacity_value
-            
-            cursor.close()
-            return ""
-            
+            return self._get_characteristic(product_data, 'capacity')
         except Exception as e:
             print(f"Error extracting capacity from database: {e}")
             return ""
@@ -350,38 +740,7 @@ class BazarchicDB:
     def get_dlc_from_product(self, product_data):
         """Extract DLC (Date limite de consommation) from product data"""
         try:
-            product_group_id = product_data.get('product_group_id')
-            if not product_group_id:
-                return ""
-            
-            cursor = self.connection.cursor()
-            
-            # Query for DLC (technical_spec_1_expiration_date)
-            query = """
-            SELECT dv.valeur as dlc_value
-            FROM produits_group_caracteristiques pgc
-            JOIN caracteristiques c ON pgc.idcaracteristique = c.idcaracteristique
-            JOIN dictionnaires_langues dk ON c.iddictionnaire_cle = dk.iddictionnaire
-            JOIN dictionnaires_langues dv ON c.iddictionnaire_valeur = dv.iddictionnaire
-            WHERE pgc.idproduit_group = %s
-              AND pgc.status = 'on'
-              AND c.status = 'on'
-              AND dk.valeur LIKE '%DLC%'
-            ORDER BY pgc.position
-            LIMIT 1
-            """
-            
-            cursor.execute(query, (product_group_id,))
-            result = cursor.fetchone()
-            
-            if result and result[0]:
-                dlc_value = result[0].strip()
-                cursor.close()
-                return dlc_value
-            
-            cursor.close()
-            return ""
-            
+            return self._get_characteristic(product_data, 'dlc')
         except Exception as e:
             print(f"Error extracting DLC: {e}")
             return ""
@@ -389,677 +748,485 @@ class BazarchicDB:
     def get_weight_from_product(self, product_data):
         """Extract Weight from product data"""
         try:
-            product_group_id = product_data.get('product_group_id')
-            if not product_group_id:
-                return ""
-            
-            cursor = self.connection.cursor()
-
-            # Query for Poids net du produit (technical_spec_1_net_weight)
-            query = """
-            SELECT dv.valeur as weight_value
-            FROM produits_group_caracteristiques pgc
-            JOIN caracteristiques c ON pgc.idcaracteristique = c.idcaracteristique
-            JOIN dictionnaires_langues dk ON c.iddictionnaire_cle = dk.iddictionnaire
-            JOIN dictionnaires_langues dv ON c.iddictionnaire_valeur = dv.iddictionnaire
-            WHERE pgc.idproduit_group = %s
-              AND pgc.status = 'on'
-              AND c.status = 'on'
-              AND dk.valeur LIKE '%Poids%'
-            ORDER BY pgc.position
-            LIMIT 1
-            """
-            
-            cursor.execute(query, (product_group_id,))
-            result = cursor.fetchone()
-            
-            if result and result[0]:
-                dlc_value = result[0].strip()
-                cursor.close()
-                return dlc_value
-            
-            cursor.close()
-            return ""
-            
+            return self._get_characteristic(product_data, 'weight')
         except Exception as e:
             print(f"Error extracting Weight: {e}")
             return ""
-    
+
     def get_dimensions_from_product(self, product_data):
         """Extract Dimensions from product data"""
         try:
-            product_group_id = product_data.get('product_group_id')
-            if not product_group_id:
-                return ""
-            
-            cursor = self.connection.cursor()
-
-            # Query for Dimensions (technical_spec_1_dimensions)
-            query = """
-            SELECT dv.valeur as dimensions_value
-            FROM produits_group_caracteristiques pgc
-            JOIN caracteristiques c ON pgc.idcaracteristique = c.idcaracteristique
-            JOIN dictionnaires_langues dk ON c.iddictionnaire_cle = dk.iddictionnaire
-            JOIN dictionnaires_langues dv ON c.iddictionnaire_valeur = dv.iddictionnaire
-            WHERE pgc.idproduit_group = %s
-              AND pgc.status = 'on'
-              AND c.status = 'on'
-              AND dk.valeur LIKE '%Dimensions%'
-            ORDER BY pgc.position
-            LIMIT 1
-            """
-            
-            cursor.execute(query, (product_group_id,))
-            result = cursor.fetchone()
-            
-            if result and result[0]:
-                dlc_value = result[0].strip()
-                cursor.close()
-                return dlc_value
-            
-            cursor.close()
-            return ""
-            
+            return self._get_characteristic(product_data, 'dimensions')
         except Exception as e:
-            print(f"Error extracting DLC: {e}")
+            print(f"Error extracting Dimensions: {e}")
             return ""
 
     def get_motif_from_product(self, product_data):
         """Extract Motif from product data"""
         try:
-            product_group_id = product_data.get('product_group_id')
-            if not product_group_id:
-                return ""
-            
-            cursor = self.connection.cursor()
-            
-            # Query for DDM (technical_spec_1_pattern)
-            query = """
-            SELECT dv.valeur as motif_value
-            FROM produits_group_caracteristiques pgc
-            JOIN caracteristiques c ON pgc.idcaracteristique = c.idcaracteristique
-            JOIN dictionnaires_langues dk ON c.iddictionnaire_cle = dk.iddictionnaire
-            JOIN dictionnaires_langues dv ON c.iddictionnaire_valeur = dv.iddictionnaire
-            WHERE pgc.idproduit_group = %s
-              AND pgc.status = 'on'
-              AND c.status = 'on'
-              AND dk.valeur LIKE '%Motif%'
-            ORDER BY pgc.position
-            LIMIT 1
-            """
-            
-            cursor.execute(query, (product_group_id,))
-            result = cursor.fetchone()
-            
-            if result and result[0]:
-                ddm_value = result[0].strip()
-                cursor.close()
-                return ddm_value
-            
-            cursor.close()
-            return ""
-            
+            return self._get_characteristic(product_data, 'motif')
         except Exception as e:
-            print(f"Error extracting DDM: {e}")
+            print(f"Error extracting Motif: {e}")
             return ""
-    
+
     def get_ddm_from_product(self, product_data):
         """Extract DDM (Date de durabilité minimale) from product data"""
         try:
-            product_group_id = product_data.get('product_group_id')
-            if not product_group_id:
-                return ""
-            
-            cursor = self.connection.cursor()
-            
-            # Query for DDM (technical_spec_1_durability_date)
-            query = """
-            SELECT dv.valeur as ddm_value
-            FROM produits_group_caracteristiques pgc
-            JOIN caracteristiques c ON pgc.idcaracteristique = c.idcaracteristique
-            JOIN dictionnaires_langues dk ON c.iddictionnaire_cle = dk.iddictionnaire
-            JOIN dictionnaires_langues dv ON c.iddictionnaire_valeur = dv.iddictionnaire
-            WHERE pgc.idproduit_group = %s
-              AND pgc.status = 'on'
-              AND c.status = 'on'
-              AND (dk.valeur LIKE '%DDM%' OR dk.valeur LIKE '%durabilité%')
-            ORDER BY pgc.position
-            LIMIT 1
-            """
-            
-            cursor.execute(query, (product_group_id,))
-            result = cursor.fetchone()
-            
-            if result and result[0]:
-                ddm_value = result[0].strip()
-                cursor.close()
-                return ddm_value
-            
-            cursor.close()
-            return ""
-            
+            return self._get_characteristic(product_data, 'ddm')
         except Exception as e:
             print(f"Error extracting DDM: {e}")
             return ""
 
     def get_ingredients_from_product(self, product_data):
         """"Extract ingredients from product data using the proper database structure as per PDF documentation"""
-        cursor = None
         try:
-            product_group_id = product_data.get('product_group_id')
-            if not product_group_id or product_group_id == 0:
-                return ""
-            
-            cursor = self.connection.cursor()
-            
-            query = """
-            SELECT dv.valeur
-            FROM produits_group_caracteristiques pgc
-            JOIN caracteristiques c ON pgc.idcaracteristique = c.idcaracteristique
-            JOIN dictionnaires_langues dk ON c.iddictionnaire_cle = dk.iddictionnaire
-            JOIN dictionnaires_langues dv ON c.iddictionnaire_valeur = dv.iddictionnaire
-            WHERE pgc.idproduit_group = %s
-              AND pgc.status = 'on'
-              AND c.status = 'on'
-              AND (dk.valeur = 'Ingrédients' 
-                   OR dk.valeur = 'Ingredients' 
-                   OR dk.valeur LIKE '%ngrédient%'
-                   OR dk.valeur LIKE '%ngredient%')
-              AND dv.valeur IS NOT NULL
-              AND LENGTH(dv.valeur) > 20
-            ORDER BY pgc.position
-            LIMIT 1
-            """
-            
-            cursor.execute(query, (int(product_group_id),))
-            result = cursor.fetchone()
-            
-            if result and result[0]:
-                care_text = result[0].strip()
-                care_text = care_text.replace('\n', ' ').replace('\r', ' ')
-                care_text = care_text.replace('  ', ' ')
-                if len(care_text) > 1000:
-                    care_text = care_text[:1000] + "..."
-                return care_text
-            
-            return ""
-            
+            return self._get_characteristic(product_data, 'ingredients')
         except Exception as e:
             print(f"Error extracting ingredients: {e}")
             return ""
-        finally:
-            if cursor:
-                cursor.close()
 
     def get_color_from_product(self, product_data):
         """"Extract color from product data using the proper database structure as per PDF documentation"""
-        cursor = None
         try:
-            product_group_id = product_data.get('product_group_id')
-            if not product_group_id or product_group_id == 0:
-                return ""
-            
-            cursor = self.connection.cursor()
-            
-            query = """
-            SELECT dv.valeur
-            FROM produits_group_caracteristiques pgc
-            JOIN caracteristiques c ON pgc.idcaracteristique = c.idcaracteristique
-            JOIN dictionnaires_langues dk ON c.iddictionnaire_cle = dk.iddictionnaire
-            JOIN dictionnaires_langues dv ON c.iddictionnaire_valeur = dv.iddictionnaire
-            WHERE pgc.idproduit_group = %s
-              AND pgc.status = 'on'
-              AND c.status = 'on'
-              AND (dk.valeur = 'Couleurs' 
-                   OR dk.valeur = 'Couleur')
-              AND dv.valeur IS NOT NULL
-              AND LENGTH(dv.valeur) > 20
-            ORDER BY pgc.position
-            LIMIT 1
-            """
-            
-            cursor.execute(query, (int(product_group_id),))
-            result = cursor.fetchone()
-            
-            if result and result[0]:
-                care_text = result[0].strip()
-                care_text = care_text.replace('\n', ' ').replace('\r', ' ')
-                care_text = care_text.replace('  ', ' ')
-                if len(care_text) > 500:
-                    care_text = care_text[:500] + "..."
-                return care_text
-            
-            return ""
-            
+            return self._get_characteristic(product_data, 'color')
         except Exception as e:
             print(f"Error extracting care color: {e}")
             return ""
-        finally:
-            if cursor:
-                cursor.close()
 
     def get_care_advice_from_product(self, product_data):
         """Extract care advice from product data"""
-        cursor = None
         try:
-            product_group_id = product_data.get('product_group_id')
-            if not product_group_id or product_group_id == 0:
-                return ""
-            
-            cursor = self.connection.cursor()
-            
-            query = """
-            SELECT dv.valeur
-            FROM produits_group_caracteristiques pgc
-            JOIN caracteristiques c ON pgc.idcaracteristique = c.idcaracteristique
-            JOIN dictionnaires_langues dk ON c.iddictionnaire_cle = dk.iddictionnaire
-            JOIN dictionnaires_langues dv ON c.iddictionnaire_valeur = dv.iddictionnaire
-            WHERE pgc.idproduit_group = %s
-              AND pgc.status = 'on'
-              AND c.status = 'on'
-              AND dk.valeur = 'Conseil d''entretien'
-              AND dv.valeur IS NOT NULL
-              AND LENGTH(dv.valeur) > 10
-            ORDER BY pgc.position
-            LIMIT 1
-            """
-            
-            cursor.execute(query, (int(product_group_id),))
-            result = cursor.fetchone()
-            
-            if result and result[0]:
-                care_text = result[0].strip()
-                care_text = care_text.replace('\n', ' ').replace('\r', ' ')
-                care_text = care_text.replace('  ', ' ')
-                if len(care_text) > 500:
-                    care_text = care_text[:500] + "..."
-                return care_text
-            
-            return ""
-            
+            return self._get_characteristic(product_data, 'care_advice')
         except Exception as e:
             print(f"Error extracting care advice: {e}")
             return ""
-        finally:
-            if cursor:
-                cursor.close()
-    
+
     def get_composition_from_product(self, product_data, composition_number=1):
         """Extract composition fields from product data"""
         try:
-            product_group_id = product_data.get('product_group_id')
-            if not product_group_id:
-                return ""
-            
-            cursor = self.connection.cursor()
-            
-            query = """
-            SELECT dv.valeur
-            FROM produits_group_caracteristiques pgc
-            JOIN caracteristiques c ON pgc.idcaracteristique = c.idcaracteristique
-            JOIN dictionnaires_langues dk ON c.iddictionnaire_cle = dk.iddictionnaire
-            JOIN dictionnaires_langues dv ON c.iddictionnaire_valeur = dv.iddictionnaire
-            WHERE pgc.idproduit_group = %s
-            AND pgc.status = 'on'
-            AND c.status = 'on'
-            AND dk.valeur LIKE '%Composition%'
-            AND dv.valeur IS NOT NULL
-            AND LENGTH(dv.valeur) > 5
-            ORDER BY pgc.position
-            LIMIT 3
-            """
-            
-            cursor.execute(query, (product_group_id,))
-            results = cursor.fetchall()
-            
-            if results and len(results) >= composition_number:
-                comp_text = results[composition_number - 1][0].strip()
-                comp_text = comp_text.replace('\n', ' ').replace('\r', ' ')
-                comp_text = comp_text.replace('  ', ' ')
-                if len(comp_text) > 200:
-                    comp_text = comp_text[:200] + "..."
-                cursor.close()
-                return comp_text
-            
-            cursor.close()
-            return ""
-            
+            return self._get_characteristic(product_data, 'composition', composition_number)
         except Exception as e:
             print(f"Error extracting composition {composition_number}: {e}")
             return ""
 
-    def export_comprehensive_csv(self, limit=None, ean_filter=None):
-        """Export products with comprehensive data and DEEP database relationships
-        Creates separate CSV files for found and not found EANs when searching by EAN"""
+    def _run_on_pooled_connection(self, fetch, *args, dictionary=False):
+        """Run fetch(cursor, *args) on a connection checked out from the pool"""
+        connection = self.pool.get_connection()
+        cursor = connection.cursor(dictionary=dictionary)
         try:
-            # Enhanced comprehensive query with DEEP JOINs using produits_view3
-            base_query = """
-            SELECT 
-                -- Category (from categories table via idrows)
-                '' as 'Catégorie',
-                
-                -- Shop SKU (product reference)
-                p.ref as 'Shop sku',
-                
-                -- Product Title (use nom_fr from view, fallback to keywords)
-                CASE 
-                    WHEN p.nom_fr != '' AND p.nom_fr IS NOT NULL THEN p.nom_fr
-                    WHEN p.keywords != '' AND p.keywords IS NOT NULL THEN p.keywords
-                    ELSE CONCAT('Produit ', p.idproduit)
-                END as 'Titre du produit',
-                
-                -- Brand (marque_fr is directly in the view)
-                COALESCE(p.marque_fr, 'Marque inconnue') as 'Marque',
-                
-                -- Long Description (description_fr is directly in the view)
-                COALESCE(p.description_fr, '') as 'Description Longue',
-                
-                -- EAN code
-                COALESCE(p.ean, '') as 'EAN',
-                
-                -- Commercial Color (empty for now, would need color specifications)
-                '' as 'Couleur commercial',
-                
-                -- Images from produits_gallery with REAL CDN URLs
-                CASE 
-                    WHEN g1.idimage IS NOT NULL THEN CONCAT('https://cdn.bazarchic.com/i/tmp/', g1.idimage, '.', g1.ext)
-                    ELSE ''
-                END as 'Image principale',
-                
-                CASE 
-                    WHEN g2.idimage IS NOT NULL THEN CONCAT('https://cdn.bazarchic.com/i/tmp/', g2.idimage, '.', g2.ext)
-                    ELSE ''
-                END as 'image secondaire',
-                
-                CASE 
-                    WHEN g3.idimage IS NOT NULL THEN CONCAT('https://cdn.bazarchic.com/i/tmp/', g3.idimage, '.', g3.ext)
-                    ELSE ''
-                END as 'Image 3',
-                
-                CASE 
-                    WHEN g4.idimage IS NOT NULL THEN CONCAT('https://cdn.bazarchic.com/i/tmp/', g4.idimage, '.', g4.ext)
-                    ELSE ''
-                END as 'Image 4',
-                
-                CASE 
-                    WHEN g5.idimage IS NOT NULL THEN CONCAT('https://cdn.bazarchic.com/i/tmp/', g5.idimage, '.', g5.ext)
-                    ELSE ''
-                END as 'Image 5',
-                
-                CASE 
-                    WHEN g6.idimage IS NOT NULL THEN CONCAT('https://cdn.bazarchic.com/i/tmp/', g6.idimage, '.', g6.ext)
-                    ELSE ''
-                END as 'Image 6',
-                
-                CASE 
-                    WHEN g7.idimage IS NOT NULL THEN CONCAT('https://cdn.bazarchic.com/i/tmp/', g7.idimage, '.', g7.ext)
-                    ELSE ''
-                END as 'Image 7',
-                
-                CASE 
-                    WHEN g8.idimage IS NOT NULL THEN CONCAT('https://cdn.bazarchic.com/i/tmp/', g8.idimage, '.', g8.ext)
-                    ELSE ''
-                END as 'Image 8',
-                
-                CASE 
-                    WHEN g9.idimage IS NOT NULL THEN CONCAT('https://cdn.bazarchic.com/i/tmp/', g9.idimage, '.', g9.ext)
-                    ELSE ''
-                END as 'Image 9',
-                
-                CASE 
-                    WHEN g10.idimage IS NOT NULL THEN CONCAT('https://cdn.bazarchic.com/i/tmp/', g10.idimage, '.', g10.ext)
-                    ELSE ''
-                END as 'Image_10',
-                
-                -- Product Parent (based on group ID)
-                CASE 
-                    WHEN p.idproduit_group > 0 THEN 'Oui'
-                    ELSE 'Non' 
-                END as 'Produit Parent (identification)',
-                
-                -- Attachment ID (variant group code - need to get from produits_group)
-                '' as 'Id de rattachement',
-                
-                -- Composition fields (empty, would need additional product detail tables)
-                '' as 'Composition 1',
-                '' as 'Composition 2',
-                '' as 'Composition 3',
-                
-                -- Care advice
-                '' as 'Conseil d''entretien',
-                
-                -- Capacity & Dimensions - extract from product name/description
-                '' as 'Capacité',  -- Will be filled by Python logic
-                '' as 'Dimensions',
-                
-                -- Expiration dates - will be filled by Python logic  
-                '' as 'DLC (Date limite de consommation)',  -- Will be filled by Python logic
-                '' as 'DDM (Date de durabilité minimale)',  -- Will be filled by Python logic
-                
-                -- Ingredients from database - will be filled by Python logic  
-                p.idproduit_group as 'product_group_id',
-                '' as 'Ingrédients',
-                
-                -- Net weight (from poids field)
-                CASE 
-                    WHEN p.poids > 0 THEN CONCAT(p.poids)
-                    ELSE ''
-                END as 'Poids net du produit',
-                
-                -- Pattern (empty, would need specifications)
-                '' as 'Motif',
-                
-                -- Commercial warranty (empty, would need specifications)
-                '' as 'Garantie commerciale',
-                
-                -- Eco-responsible (default to No)
-                'Non' as 'Eco-responsable',
-                
-                -- Metrage (default to No) 
-                'Non' as 'Métrage ? (oui /non)',
-                
-                -- Product or Service (based on virtual flag)
-                CASE 
-                    WHEN p.virtuel = 'oui' THEN 'Service'
-                    ELSE 'Produit'
-                END as 'Produit ou Service',
-                
-                -- BZC (empty as requested)
-                '' as 'BZC ( à ne pas remplir )',
-                
-                -- Package weight (from poids)
-                COALESCE(p.poids, 0) as 'Poids du colis (kg)',
-                
-                -- Size from cols column with T.U. = "Taille Unique" condition
-                CASE
-                    WHEN p.cols IN ('T.U.', 'T.U') THEN 'Taille Unique'
-                    WHEN p.cols LIKE 'T.%' THEN SUBSTRING(p.cols, 3) 
-                    WHEN p.cols IS NULL OR p.cols = '' THEN ''   
-                    ELSE p.cols
-                END AS `Taille unique`,
-                
-                -- Additional data for Python processing
-                p.nom_fr as 'product_name_for_capacity',
-                p.description_fr as 'description_for_specs',
-                '' as 'has_dlc_flag'
-                
-            FROM produits_view3 p
-            LEFT JOIN produits_gallery g1 ON p.idproduit_group = g1.idproduit_group AND g1.position = 0 AND g1.status = 'on'
-            LEFT JOIN produits_gallery g2 ON p.idproduit_group = g2.idproduit_group AND g2.position = 1 AND g2.status = 'on'
-            LEFT JOIN produits_gallery g3 ON p.idproduit_group = g3.idproduit_group AND g3.position = 2 AND g3.status = 'on'
-            LEFT JOIN produits_gallery g4 ON p.idproduit_group = g4.idproduit_group AND g4.position = 3 AND g4.status = 'on'
-            LEFT JOIN produits_gallery g5 ON p.idproduit_group = g5.idproduit_group AND g5.position = 4 AND g5.status = 'on'
-            LEFT JOIN produits_gallery g6 ON p.idproduit_group = g6.idproduit_group AND g6.position = 5 AND g6.status = 'on'
-            LEFT JOIN produits_gallery g7 ON p.idproduit_group = g7.idproduit_group AND g7.position = 6 AND g7.status = 'on'
-            LEFT JOIN produits_gallery g8 ON p.idproduit_group = g8.idproduit_group AND g8.position = 7 AND g8.status = 'on'
-            LEFT JOIN produits_gallery g9 ON p.idproduit_group = g9.idproduit_group AND g9.position = 8 AND g9.status = 'on'
-            LEFT JOIN produits_gallery g10 ON p.idproduit_group = g10.idproduit_group AND g10.position = 9 AND g10.status = 'on'
-            WHERE p.status = 'on'
-            """
-            
-            # Add EAN filter if provided
-            if ean_filter:
-                if isinstance(ean_filter, str):
-                    ean_filter = [ean_filter]
-                
-                clean_eans = [str(ean).strip() for ean in ean_filter if str(ean).strip()]
-                if clean_eans:
-                    ean_placeholders = ', '.join(['%s'] * len(clean_eans))
-                    base_query += f" AND p.ean IN ({ean_placeholders})"
-            
-            # Add limit if specified
-            if limit:
-                base_query += f" LIMIT {limit}"
-            
-            print(f"\n🚀 Starting comprehensive CSV export with exact headers...")
-            print("=" * 60)
-            
-            cursor = self.connection.cursor(dictionary=True)
-            
-            # Execute query
-            if ean_filter and clean_eans:
-                cursor.execute(base_query, clean_eans)
-            else:
-                cursor.execute(base_query)
-            
-            products = cursor.fetchall()
-            total_exported = len(products)
-            
+            return fetch(cursor, *args)
+        finally:
             cursor.close()
+            connection.close()  # Returns the connection to the pool
+    
+    def _map_on_pooled_connections(self, fetch_batch, batches, dictionary=False):
+        """Run fetch_batch(cursor, batch) for every batch on parallel pooled
+        connections (LOOKUP_WORKERS at most) and yield the results in order"""
+        if not batches:
+            return
+        with ThreadPoolExecutor(max_workers=min(LOOKUP_WORKERS, len(batches))) as executor:
+            yield from executor.map(
+                lambda batch: self._run_on_pooled_connection(fetch_batch, batch, dictionary=dictionary), batches
+            )
+    
+    def _fetch_by_group_batches(self, product_group_ids, fetch_batch):
+        """Split product group ids into IN (...) sized batches, run fetch_batch on
+        each in parallel pooled connections and merge the returned dicts"""
+        group_ids = sorted({int(gid) for gid in product_group_ids if gid})
+        batches = [group_ids[start:start + IN_CLAUSE_BATCH_SIZE]
+                   for start in range(0, len(group_ids), IN_CLAUSE_BATCH_SIZE)]
+        
+        results = {}
+        for partial in self._map_on_pooled_connections(fetch_batch, batches):
+            results.update(partial)
+        
+        return results
+    
+    def get_gallery_batch(self, product_group_ids):
+        """Get the first 10 gallery image URLs of many product groups at once
+        
+        Positions 0-9 are pivoted in Python from a single indexed range scan per
+        batch of groups, instead of joining produits_gallery once per position."""
+        try:
+            return self._fetch_by_group_batches(product_group_ids, self._fetch_gallery_batch)
+        except mysql.connector.errors.PoolError:
+            # No connection to run the lookup on: fail the export rather than
+            # write rows without images
+            raise
+        except Exception as e:
+            print(f"Error extracting gallery images: {e}")
+            return {}
+    
+    def _fetch_gallery_batch(self, cursor, group_ids):
+        """Query the gallery images of one batch of product groups"""
+        placeholders = ', '.join(['%s'] * len(group_ids))
+        query = f"""
+        SELECT idproduit_group, position, idimage, ext
+        FROM produits_gallery
+        WHERE idproduit_group IN ({placeholders})
+          AND status = 'on'
+          AND position BETWEEN 0 AND {GALLERY_SIZE - 1}
+        """
+        
+        galleries = {}
+        cursor.execute(query, group_ids)
+        for group_id, position, idimage, ext in cursor.fetchall():
+            if idimage is None or ext is None:
+                continue
+            images = galleries.setdefault(group_id, [''] * GALLERY_SIZE)
+            images[position] = CDN_IMAGE_URL.format(idimage, ext)
+        
+        return galleries
+
+    def get_characteristics_batch(self, product_group_ids):
+        """Get every CHARACTERISTIC_CONDITIONS field of many product groups at once
+        
+        Returns {product_group_id: {field: value}}. Like the per-product getters,
+        each field takes the first matching characteristic by position; fields in
+        CHARACTERISTIC_MULTI_VALUES hold a list of the first few matches instead."""
+        try:
+            group_ids = {int(gid) for gid in product_group_ids if gid}
+            
+            # Groups are shared by many products: only query the ones not seen yet
+            cache = self.characteristics_cache
+            if len(cache) + len(group_ids) > CHARACTERISTICS_CACHE_SIZE:
+                cache.clear()
+            missing = [gid for gid in group_ids if gid not in cache]
+            
+            if missing:
+                fetched = self._fetch_by_group_batches(missing, self._fetch_characteristics_batch)
+                for gid in missing:
+                    cache[gid] = fetched.get(gid, {})
+            
+            return {gid: cache[gid] for gid in group_ids}
+        except mysql.connector.errors.PoolError:
+            raise  # See get_gallery_batch
+        except Exception as e:
+            print(f"Error extracting characteristics: {e}")
+            return {}
+    
+    def _fetch_characteristics_batch(self, cursor, group_ids):
+        """Query the technical characteristics of one batch of product groups"""
+        fields = list(CHARACTERISTIC_CONDITIONS)
+        field_flags = ',\n'.join(
+            f"({condition}) AS is_{field}" for field, condition in CHARACTERISTIC_CONDITIONS.items()
+        )
+        any_field = ' OR '.join(f"({condition})" for condition in CHARACTERISTIC_CONDITIONS.values())
+        placeholders = ', '.join(['%s'] * len(group_ids))
+        query = f"""
+        SELECT pgc.idproduit_group, dv.valeur,
+        {field_flags}
+        {CHARACTERISTICS_FROM}
+        WHERE pgc.idproduit_group IN ({placeholders})
+          AND pgc.status = 'on'
+          AND c.status = 'on'
+          AND ({any_field})
+        ORDER BY pgc.idproduit_group, pgc.position
+        """
+        
+        characteristics = {}
+        cursor.execute(query, group_ids)
+        for group_id, value, *flags in cursor.fetchall():
+            group_values = characteristics.setdefault(group_id, {})
+            value = value.strip() if value else ''
+            for field, flag in zip(fields, flags):
+                if not flag:
+                    continue
+                max_values = CHARACTERISTIC_MULTI_VALUES.get(field)
+                if max_values:
+                    values = group_values.setdefault(field, [])
+                    if len(values) < max_values:
+                        values.append(clean_characteristic(field, value))
+                elif field not in group_values:
+                    group_values[field] = clean_characteristic(field, value)
+        
+        return characteristics
+
+    def _load_ean_filter(self, cursor, eans):
+        """Load eans (any iterable, consumed as it is read) into the _ean_filter
+        temporary table of cursor's connection, numbered by their position (pos)
+        
+        The ean column is copied from produits_view3 so the join compares values
+        with the same type and collation. The table uses the default (InnoDB)
+        engine: a MEMORY table is capped by max_heap_table_size and would fill
+        up on large EAN files."""
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS _ean_filter")
+        cursor.execute("""
+            CREATE TEMPORARY TABLE _ean_filter (pos INT NOT NULL, PRIMARY KEY (ean))
+            SELECT ean FROM produits_view3 LIMIT 0
+        """)
+        # executemany folds its rows into a single multi-row INSERT, so the
+        # rows are sent EAN_CHUNK_SIZE at a time to stay under max_allowed_packet
+        numbered = enumerate(eans)
+        while True:
+            chunk = list(islice(numbered, EAN_CHUNK_SIZE))
+            if not chunk:
+                break
+            cursor.executemany("INSERT IGNORE INTO _ean_filter (pos, ean) VALUES (%s, %s)", chunk)
+
+    def _comprehensive_query(self, ean_filtered=False, sample=False):
+        """SQL of the comprehensive export, one row per active product
+        
+        With ean_filtered=True the rows come from the _ean_filter temporary table
+        (see _load_ean_filter) LEFT JOINed to the view, in input order, with the
+        extra filter_ean and ean_not_found columns. With sample=True they are the
+        first active products by id, as many as the single %s parameter."""
+        from_sql = "produits_view3 p"
+        where_sql = "WHERE p.status = 'on'"
+        ean_sql = ""
+        if ean_filtered:
+            # LEFT JOIN from the filter so EANs without a product come
+            # back too, as a row whose view columns are all NULL
+            from_sql = "_ean_filter f\n            LEFT JOIN produits_view3 p ON p.ean = f.ean AND p.status = 'on'"
+            where_sql = "ORDER BY f.pos"
+            ean_sql = "f.ean as 'filter_ean', p.idproduit IS NULL as 'ean_not_found',"
+        elif sample:
+            # The full export's rows, first ones by id, in a single read of the view
+            where_sql += "\n        ORDER BY p.idproduit\n        LIMIT %s"
+        
+        # Enhanced comprehensive query with DEEP JOINs using produits_view3
+        return f"""
+        SELECT 
+            -- Shop SKU (product reference)
+            p.ref as 'Shop sku',
+            
+            -- Product Title (use nom_fr from view, fallback to keywords)
+            CASE 
+                WHEN p.nom_fr != '' AND p.nom_fr IS NOT NULL THEN p.nom_fr
+                WHEN p.keywords != '' AND p.keywords IS NOT NULL THEN p.keywords
+                ELSE CONCAT('Produit ', p.idproduit)
+            END as 'Titre du produit',
+            
+            -- Brand (marque_fr is directly in the view)
+            COALESCE(p.marque_fr, 'Marque inconnue') as 'Marque',
+            
+            -- Long Description (description_fr is directly in the view)
+            COALESCE(p.description_fr, '') as 'Description Longue',
+            
+            -- EAN code
+            COALESCE(p.ean, '') as 'EAN',
+            
+            -- Group id for the batched characteristic/gallery lookups; color,
+            -- compositions, care advice, capacity, dimensions, DLC/DDM,
+            -- ingredients, net weight and pattern are all filled by Python,
+            -- as are the product parent flag and the constant columns
+            p.idproduit_group as 'product_group_id',
+            
+            -- Virtual flag, turned into Produit / Service by Python
+            p.virtuel as 'virtuel',
+            
+            -- Package weight (from poids)
+            COALESCE(p.poids, 0) as 'Poids du colis (kg)',
+            
+            -- Size from cols column with T.U. = "Taille Unique" condition
+            CASE
+                WHEN p.cols IN ('T.U.', 'T.U') THEN 'Taille Unique'
+                WHEN p.cols LIKE 'T.%' THEN SUBSTRING(p.cols, 3) 
+                WHEN p.cols IS NULL OR p.cols = '' THEN ''   
+                ELSE p.cols
+            END AS `Taille unique`,
+            
+            -- Additional data for Python processing
+            {ean_sql}
+            p.nom_fr as 'product_name_for_capacity'
+            
+        FROM {from_sql}
+        {where_sql}
+        """
+
+    def _comprehensive_row_builder(self, column_names):
+        """Return build_rows(products), which enriches a batch of comprehensive
+        query rows (tuples with the given column_names) with their gallery and
+        characteristics and turns them into CSV rows in COMPREHENSIVE_HEADERS order"""
+        group_index, product_fields, head_columns, tail_columns = comprehensive_row_getters(column_names)
+        
+        def build_product_row(prod, galleries, characteristics):
+            """Helper function to build the CSV row of a product"""
+            description, ean, group_id, product_name, virtuel = product_fields(prod)
             
-            # Define headers and mappings
-            display_headers = [
-                'Category', 'Shop sku', 'Titre du produit', 'Marque', 'Description Longue',
-                'EAN', 'Couleur commercial', 'Image principale', 'image secondaire',
-                'Image 3', 'Image 4', 'Image 5', 'Image 6', 'Image 7', 'Image 8',
-                'Image 9', 'Image_10', 'Produit Parent (identification)', 'Id de rattachement',
-                'Composition 1', 'Composition 2', 'Composition 3', 'Conseil d\'entretien',
-                'Capacité', 'Dimensions', 'DLC (Date limite de consommation)',
-                'DDM (Date de durabilité minimale)', 'Ingrédients', 'Poids net du produit',
-                'Motif', 'Garantie commerciale', 'Eco-responsable', 'Métrage ? (oui /non)',
-                'Produit ou Service', 'BZC ( à ne pas remplir )', 'Poids du colis (kg)', 'Taille unique'
-            ]
+            # Clean HTML from description
+            desc_cleaned = clean_html(description)
             
-            technical_mappings = [
-                'family_id', 'shop_sku', 'name', 'brand_id', 'description',
-                'ean', 'technical_spec_1_color', 'media_1', 'media_2',
-                'media_3', 'media_4', 'media_5', 'media_6', 'media_7', 'media_8',
-                'media_9', 'media_10', 'is_parent', 'variant_group_code',
-                'technical_spec_1_composition', 'technical_spec_2_composition', 'technical_spec_3_composition', 'technical_spec_1_care_advice',
-                'technical_spec_1_capacity', 'technical_spec_1_dimensions', 'technical_spec_1_expiration_date',
-                'technical_spec_1_durability_date', 'technical_spec_1_ingredients', 'technical_spec_1_net_weight',
-                'technical_spec_1_pattern', 'technical_spec_1_commercial_warranty', 'technical_spec_1_eco_responsibility', 'is_cloth',
-                'is_virtual', 'is_bzc', 'weight', 'size_id'
-            ]
+            chars = characteristics.get(group_id, {})
             
-            def write_product_row(prod, writer):
-                """Helper function to write a product row"""
-                # Clean HTML from description
-                desc_cleaned = clean_html(prod.get('Description Longue', ''))
-                
-                # Extract capacity from database using proper relationships
-                capacity = self.get_capacity_from_product(prod)
-                # Fallback to text extraction if no database capacity found
+            # Extract capacity from database using proper relationships
+            capacity = chars.get('capacity', '')
+            # Fallback to text extraction if no database capacity found
+            if not capacity:
+                capacity = extract_capacity_from_name(product_name)
                 if not capacity:
-                    capacity = self.extract_capacity_from_text(prod.get('product_name_for_capacity', ''))
-                    if not capacity:
-                        capacity = self.extract_capacity_from_text(desc_cleaned)
-                
-                # Extract dimensions from database using proper relationships
-                dimensions = self.get_dimensions_from_product(prod)
-
-                #Extract weight from database using proper relationships
-                weight = self.get_weight_from_product(prod)
-
-                #Extract color from database using proper relationships
-                color = self.get_color_from_product(prod)
+                    capacity = extract_capacity(desc_cleaned)
+            
+            # Every other technical field comes from the same batched lookup
+            dimensions = chars.get('dimensions', '')
+            weight = chars.get('weight', '')
+            color = chars.get('color', '')
+            motif = chars.get('motif', '')
+            dlc = chars.get('dlc', '')
+            ddm = chars.get('ddm', '')
+            ingredients = chars.get('ingredients', '')
+            care_advice = chars.get('care_advice', '')
+            composition1, composition2, composition3 = (*chars.get('composition', ()), '', '', '')[:3]
+            
+            # Product parent from the group id, product or service from the
+            # virtual flag (compared like the column collation would)
+            parent = 'Oui' if group_id and group_id > 0 else 'Non'
+            service = 'Service' if virtuel and virtuel.rstrip().lower() == 'oui' else 'Produit'
+            
+            # Category, attachment id, commercial warranty and BZC stay empty;
+            # eco-responsible and metrage default to No. Size is already
+            # handled in SQL query (last of the tail columns)
+            return [
+                '', *head_columns(prod), desc_cleaned, ean,
+                color, *galleries.get(group_id, EMPTY_GALLERY),
+                parent, '',
+                composition1, composition2, composition3,
+                care_advice, capacity, dimensions,
+                dlc, ddm,
+                ingredients, weight, motif,
+                '', 'Non', 'Non', service, '',
+                *tail_columns(prod)
+            ]
+        
+        def build_rows(products):
+            # One batched gallery and characteristics lookup for the whole batch
+            group_ids = [prod[group_index] for prod in products]
+            galleries = self.get_gallery_batch(group_ids)
+            characteristics = self.get_characteristics_batch(group_ids)
+            return [build_product_row(prod, galleries, characteristics) for prod in products]
+        
+        return build_rows
 
-                #Extract motif from database using proper relationships
-                motif = self.get_motif_from_product(prod)
+    def iter_comprehensive_rows(self, limit=None, batch_size=10000):
+        """Yield the comprehensive export of every active product as lists of CSV
+        rows (COMPREHENSIVE_HEADERS order), one list per batch_size products
+        
+        Rows are streamed from an unbuffered cursor on a pooled connection of
+        its own, so self.connection stays usable and memory use does not grow
+        with the size of the export."""
+        query = self._comprehensive_query(sample=bool(limit))
+        params = [int(limit)] if limit else []
+        
+        connection = self.pool.get_connection()
+        cursor = connection.cursor(buffered=False)
+        try:
+            cursor.execute(query, params)
+            build_rows = self._comprehensive_row_builder(cursor.column_names)
+            for products in prefetch_batches(cursor, batch_size):
+                yield build_rows(products)
+        finally:
+            try:
+                close_streaming_cursor(connection, cursor)
+            finally:
+                connection.close()  # Returns the connection to the pool
 
-                # Extract DLC and DDM from database using proper relationships
-                dlc = self.get_dlc_from_product(prod)
-                ddm = self.get_ddm_from_product(prod)
-                
-                # Extract ingredients from database using proper relationships
-                ingredients = self.get_ingredients_from_product(prod)
-                
-                # Extract care advice
-                care_advice = self.get_care_advice_from_product(prod)
-                
-                # Extract compositions
-                composition1 = self.get_composition_from_product(prod, 1)
-                composition2 = self.get_composition_from_product(prod, 2)
-                composition3 = self.get_composition_from_product(prod, 3)
-                
-                # Size is already handled in SQL query
-                size = prod.get('Taille unique', 'Taille Unique')
-                
-                data_row = [
-                    prod.get('Catégorie', ''), prod.get('Shop sku', ''), prod.get('Titre du produit', ''), 
-                    prod.get('Marque', ''), desc_cleaned, prod.get('EAN', ''), 
-                    color, prod.get('Image principale', ''), 
-                    prod.get('image secondaire', ''), prod.get('Image 3', ''), prod.get('Image 4', ''), 
-                    prod.get('Image 5', ''), prod.get('Image 6', ''), prod.get('Image 7', ''), 
-                    prod.get('Image 8', ''), prod.get('Image 9', ''), prod.get('Image_10', ''), 
-                    prod.get('Produit Parent (identification)', ''), prod.get('Id de rattachement', ''),
-                    composition1, composition2, composition3,
-                    care_advice, capacity, dimensions,
-                    dlc, ddm,
-                    ingredients, weight, motif,
-                    prod.get('Garantie commerciale', ''), prod.get('Eco-responsable', ''), prod.get('Métrage ? (oui /non)', ''),
-                    prod.get('Produit ou Service', ''), prod.get('BZC ( à ne pas remplir )', ''), 
-                    prod.get('Poids du colis (kg)', ''), size
-                ]
-                writer.writerow(data_row)
+    def export_comprehensive_csv(self, limit=None, ean_filter=None, compress=False, batch_size=10000):
+        """Export products with comprehensive data and DEEP database relationships
+        Creates separate CSV files for found and not found EANs when searching by EAN.
+        Both kinds of export are streamed and enriched batch_size rows at a time; with
+        compress=True every output file is written as .csv.gz."""
+        try:
+            # The EAN filter may be a generator (read_ean_file): it is cleaned
+            # lazily and only read once, while it is loaded into the server
+            clean_eans = None
+            if ean_filter:
+                if isinstance(ean_filter, str):
+                    ean_filter = [ean_filter]
+                clean_eans = peek_iterable(ean for ean in (str(ean).strip() for ean in ean_filter) if ean)
+            
+            print(f"\n🚀 Starting comprehensive CSV export with exact headers...")
+            print("=" * 60)
             
             # Generate filenames
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             
             # Handle EAN filter case - create TWO separate files
-            if ean_filter and clean_eans:
+            if clean_eans:
+                # One streaming pass over the filter table LEFT JOINed to the
+                # view, in the order the EANs were given: matched rows go to the
+                # FOUND file, unmatched EANs straight to the NOT FOUND file.
+                # An EAN filter is loaded into a temporary table and joined, so
+                # the statement text is the same for 10 or 10 000 EANs.
+                query = self._comprehensive_query(ean_filtered=True)
+                params = []
+                if limit:
+                    query += " LIMIT %s"
+                    params.append(int(limit))
+                
                 filename_found = f"comprehensive_ean_FOUND_{timestamp}.csv"
                 filename_not_found = f"comprehensive_ean_NOT_FOUND_{timestamp}.csv"
+                if compress:
+                    filename_found += '.gz'
+                    filename_not_found += '.gz'
                 
-                # Map found products by EAN
-                found_by_ean = {}
-                for prod in products:
-                    ean_key = prod.get('EAN', '')
-                    if ean_key not in found_by_ean:
-                        found_by_ean[ean_key] = []
-                    found_by_ean[ean_key].append(prod)
+                # Empty rows with only the EAN filled in (Category stays empty)
+                before_ean = [''] * COMPREHENSIVE_EAN_COLUMN
+                after_ean = [''] * (len(COMPREHENSIVE_HEADERS) - COMPREHENSIVE_EAN_COLUMN - 1)
                 
                 # Track statistics
-                found_eans = []
+                found_eans = {}
                 not_found_eans = []
-                
-                # Write FOUND products file
-                import csv
-                with open(filename_found, 'w', encoding='utf-8', newline='') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(display_headers)
-                    writer.writerow(technical_mappings)
+                total_exported = 0
+                progress = ProgressLine('products')
+                
+                cursor = self.connection.cursor(buffered=False)
+                gc.disable()  # See paused_gc
+                try:
+                    self._load_ean_filter(cursor, clean_eans)
+                    cursor.execute(query, params)
+                    build_rows = self._comprehensive_row_builder(cursor.column_names)
+                    filter_ean = cursor.column_names.index('filter_ean')
+                    ean_not_found = cursor.column_names.index('ean_not_found')
                     
-                    for ean in clean_eans:
-                        if ean in found_by_ean:
-                            found_eans.append(ean)
-                            for prod in found_by_ean[ean]:
-                                write_product_row(prod, writer)
-                
-                # Write NOT FOUND products file
-                with open(filename_not_found, 'w', encoding='utf-8', newline='') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(display_headers)
-                    writer.writerow(technical_mappings)
+                    with open_csv_output(filename_found + PARTIAL_SUFFIX, compress) as f_found, \
+                            open_csv_output(filename_not_found + PARTIAL_SUFFIX, compress) as f_not_found:
+                        writer_found = csv.writer(f_found)
+                        writer_not_found = csv.writer(f_not_found)
+                        for writer in (writer_found, writer_not_found):
+                            writer.writerow(COMPREHENSIVE_HEADERS)
+                            writer.writerow(COMPREHENSIVE_TECHNICAL_NAMES)
+                        
+                        def write_batch(found_rows, not_found_rows):
+                            writer_found.writerows(found_rows)
+                            writer_not_found.writerows(not_found_rows)
+                        
+                        # Same background writer as the regular export: a batch
+                        # is written while the next one is read and enriched
+                        with ThreadPoolExecutor(max_workers=1) as csv_writer:
+                            pending_write = None
+                            for products in prefetch_batches(cursor, batch_size):
+                                found = []
+                                not_found_rows = []
+                                for prod in products:
+                                    if prod[ean_not_found]:
+                                        not_found_eans.append(prod[filter_ean])
+                                        not_found_rows.append([*before_ean, prod[filter_ean], *after_ean])
+                                    else:
+                                        found_eans[prod[filter_ean]] = True
+                                        found.append(prod)
+                                
+                                found_rows = build_rows(found) if found else []
+                                if pending_write:
+                                    pending_write.result()
+                                pending_write = csv_writer.submit(write_batch, found_rows, not_found_rows)
+                                
+                                total_exported += len(found)
+                                progress.update(total_exported)
+                            if pending_write:
+                                pending_write.result()
+                        progress.finish()
                     
-                    for ean in clean_eans:
-                        if ean not in found_by_ean:
-                            not_found_eans.append(ean)
-                            # Write empty row with only EAN and Category
-                            empty_row = ['' for _ in display_headers]
-                            empty_row[0] = ''  # Category
-                            empty_row[display_headers.index('EAN')] = ean  # EAN
-                            writer.writerow(empty_row)
+                    cursor.execute("DROP TEMPORARY TABLE IF EXISTS _ean_filter")
+                finally:
+                    gc.enable()
+                    gc.collect()
+                    close_streaming_cursor(self.connection, cursor)
+                
+                publish_output(filename_found)
+                publish_output(filename_not_found)
+                
+                # The filter table holds each distinct EAN once
+                total_eans = len(found_eans) + len(not_found_eans)
                 
                 # Calculate file sizes
                 file_size_found = os.path.getsize(filename_found) / 1024 / 1024
@@ -1077,25 +1244,43 @@ class BazarchicDB:
                 print(f"   💾 File size: {file_size_not_found:.2f} MB")
                 print()
                 print(f"📋 Summary:")
-                print(f"   Total EANs searched: {len(clean_eans)}")
-                print(f"   Found: {len(found_eans)} ({len(found_eans)/len(clean_eans)*100:.1f}%)")
-                print(f"   Not Found: {len(not_found_eans)} ({len(not_found_eans)/len(clean_eans)*100:.1f}%)")
+                print(f"   Total EANs searched: {total_eans}")
+                print(f"   Found: {len(found_eans)} ({len(found_eans)/total_eans*100:.1f}%)")
+                print(f"   Not Found: {len(not_found_eans)} ({len(not_found_eans)/total_eans*100:.1f}%)")
                 
                 return (filename_found, filename_not_found), (len(found_eans), len(not_found_eans))
             
             else:
                 # Regular export (no EAN filter)
                 filename = f"comprehensive_products_{timestamp}.csv"
+                if compress:
+                    filename += '.gz'
+                total_exported = 0
+                progress = ProgressLine('products')
                 
-                import csv
-                with open(filename, 'w', encoding='utf-8', newline='') as f:
+                with paused_gc(), open_csv_output(filename + PARTIAL_SUFFIX, compress) as f:
                     writer = csv.writer(f)
-                    writer.writerow(display_headers)
-                    writer.writerow(technical_mappings)
+                    writer.writerow(COMPREHENSIVE_HEADERS)
+                    writer.writerow(COMPREHENSIVE_TECHNICAL_NAMES)
                     
-                    if products:
-                        for prod in products:
-                            write_product_row(prod, writer)
+                    # Batches are encoded and written on a thread of their own
+                    # while the next one is enriched; at most one batch is in
+                    # flight, and a write error surfaces through result()
+                    with ThreadPoolExecutor(max_workers=1) as csv_writer:
+                        pending_write = None
+                        for rows in self.iter_comprehensive_rows(limit, batch_size):
+                            # One writerows call per batch rather than a writerow per product
+                            if pending_write:
+                                pending_write.result()
+                            pending_write = csv_writer.submit(writer.writerows, rows)
+                            
+                            total_exported += len(rows)
+                            progress.update(total_exported)
+                        if pending_write:
+                            pending_write.result()
+                    progress.finish()
+                
+                publish_output(filename)
                 
                 file_size = os.path.getsize(filename) / 1024 / 1024
                 
@@ -1104,7 +1289,7 @@ class BazarchicDB:
                 print(f"📁 File: {filename}")
                 print(f"📊 Products exported: {total_exported:,}")
                 print(f"💾 File size: {file_size:.2f} MB") 
-                print(f"📋 Columns: {len(display_headers)} (exactly as requested)")
+                print(f"📋 Columns: {len(COMPREHENSIVE_HEADERS)} (exactly as requested)")
                 
                 return filename, total_exported
                 
@@ -1112,57 +1297,168 @@ class BazarchicDB:
             print(f"❌ Export error: {e}")
             return None, 0
 
-    def search_products_by_ean(self, ean_codes):
-        """Search products by EAN codes and export to CSV"""
+    def export_comprehensive_parquet(self, limit=None, batch_size=10000):
+        """Export the comprehensive data of every active product to a zstd
+        compressed Parquet file, one string column per COMPREHENSIVE_HEADERS entry
+        
+        Needs pyarrow, imported only here. Rows come from iter_comprehensive_rows
+        and are written in row groups of PARQUET_ROW_GROUP_SIZE; empty values are
+        stored as nulls."""
         try:
-            cursor = self.connection.cursor(dictionary=True)
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            print("❌ Parquet export needs pyarrow: pip install pyarrow")
+            return None, 0
+        
+        try:
+            print(f"\n🚀 Starting comprehensive Parquet export...")
+            start_time = time.perf_counter()
+            print("=" * 60)
             
+            filename = f"comprehensive_products_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet"
+            # The marketplace field name of each column travels in its metadata
+            schema = pa.schema([
+                pa.field(header, pa.string(), metadata={'technical_name': technical_name})
+                for header, technical_name in zip(COMPREHENSIVE_HEADERS, COMPREHENSIVE_TECHNICAL_NAMES)
+            ])
+            
+            def to_record_batch(rows):
+                columns = [pa.array([str(value) if value not in (None, '') else None for value in column],
+                                    type=pa.string())
+                           for column in zip(*rows)]
+                return pa.RecordBatch.from_arrays(columns, schema=schema)
+            
+            total_exported = 0
+            progress = ProgressLine('products')
+            
+            with paused_gc(), pq.ParquetWriter(filename + PARTIAL_SUFFIX, schema, compression='zstd',
+                                               compression_level=PARQUET_ZSTD_LEVEL) as writer:
+                # Enrichment batches are gathered into full row groups; what is
+                # left over starts the next one
+                pending, pending_rows = [], 0
+                for rows in self.iter_comprehensive_rows(limit, batch_size):
+                    pending.append(to_record_batch(rows))
+                    pending_rows += len(rows)
+                    if pending_rows >= PARQUET_ROW_GROUP_SIZE:
+                        table = pa.Table.from_batches(pending)
+                        writer.write_table(table.slice(0, PARQUET_ROW_GROUP_SIZE))
+                        rest = table.slice(PARQUET_ROW_GROUP_SIZE)
+                        pending, pending_rows = rest.to_batches(), rest.num_rows
+                    
+                    total_exported += len(rows)
+                    progress.update(total_exported)
+                if pending_rows:
+                    writer.write_table(pa.Table.from_batches(pending, schema=schema))
+                progress.finish()
+            
+            publish_output(filename)
+            
+            file_size = os.path.getsize(filename) / 1024 / 1024
+            
+            print(f"\n✅ Comprehensive Parquet export completed!")
+            print("=" * 60)
+            print(f"📁 File: {filename}")
+            print(f"📊 Products exported: {total_exported:,}")
+            print(f"💾 File size: {file_size:.2f} MB")
+            print(f"⏱️  Elapsed: {time.perf_counter() - start_time:.1f}s")
+            
+            return filename, total_exported
+            
+        except Exception as e:
+            print(f"❌ Export error: {e}")
+            return None, 0
+
+    def search_products_by_ean(self, ean_codes, columns=None):
+        """Search products by EAN codes and export to CSV
+        
+        Every column of produits_view3 is exported by default; pass columns to
+        fetch and export only those (idproduit, ean, ref and prix are always
+        included, they drive the deduplication and the console summary)."""
+        try:
             if isinstance(ean_codes, str):
                 ean_codes = [ean_codes]
             
-            # Clean EAN codes
+            # Clean EAN codes, keeping the first occurrence of each
             clean_eans = [str(ean).strip() for ean in ean_codes if str(ean).strip()]
             
             if not clean_eans:
                 print("❌ No valid EAN codes provided")
                 return None, 0
             
+            before = len(clean_eans)
+            clean_eans = list(dict.fromkeys(clean_eans))
+            if before != len(clean_eans):
+                print(f"ℹ️ Deduplicated {before - len(clean_eans)} EANs")
+            
             print(f"\n🔍 Searching for {len(clean_eans)} EAN code(s):")
             print("=" * 50)
             
-            all_products = []
+            select_sql = '*'
+            if columns:
+                select_sql = ', '.join(f"`{col}`" for col in dict.fromkeys(['idproduit', 'ean', 'ref', 'prix', *columns]))
+            
+            # Products keyed by id as they are found, which also removes the
+            # duplicates; a dict keeps the position of the first occurrence
+            products_by_id = {}
+            
+            def fetch_exact(cursor, batch):
+                placeholders = ', '.join(['%s'] * len(batch))
+                cursor.execute(f"SELECT {select_sql} FROM produits_view3 WHERE ean IN ({placeholders})", batch)
+                return cursor.fetchall()
+            
+            def fetch_partial(cursor, batch):
+                pattern = '|'.join(re.escape(ean) for ean in batch)
+                cursor.execute(f"SELECT {select_sql} FROM produits_view3 WHERE TRIM(ean) REGEXP %s", (pattern,))
+                return cursor.fetchall()
+            
+            # Exact matches for every EAN in one query per EAN_CHUNK_SIZE
+            # codes, grouped the way the server compares them (trailing spaces
+            # and case are ignored by the column collation). The batches run
+            # in parallel on pooled connections.
+            exact_by_ean = {}
+            batches = [clean_eans[start:start + EAN_CHUNK_SIZE]
+                       for start in range(0, len(clean_eans), EAN_CHUNK_SIZE)]
+            for products in self._map_on_pooled_connections(fetch_exact, batches, dictionary=True):
+                for product in products:
+                    exact_by_ean.setdefault(product['ean'].rstrip().lower(), []).append(product)
+            
+            # Codes without an exact match fall back to a substring search: one
+            # REGEXP alternation per batch of codes instead of a LIKE per code,
+            # with the matches handed back to each code in Python
+            partial_by_ean = {}
+            missing_eans = [ean for ean in clean_eans if ean.lower() not in exact_by_ean]
+            batches = [missing_eans[start:start + EAN_CHUNK_SIZE]
+                       for start in range(0, len(missing_eans), EAN_CHUNK_SIZE)]
+            for batch, products in zip(batches, self._map_on_pooled_connections(fetch_partial, batches, dictionary=True)):
+                candidates = [(product['ean'].strip().lower(), product) for product in products]
+                for ean in batch:
+                    needle = ean.lower()
+                    matches = [product for product_ean, product in candidates if needle in product_ean]
+                    if matches:
+                        partial_by_ean[ean] = matches
             
             for ean in clean_eans:
                 print(f"Searching EAN: {ean}")
                 
                 # Try exact match first
-                cursor.execute("SELECT * FROM produits_view3 WHERE ean = %s", (ean,))
-                exact_matches = cursor.fetchall()
+                exact_matches = exact_by_ean.get(ean.lower(), [])
                 
                 if exact_matches:
                     print(f"  ✅ Found {len(exact_matches)} exact match(es)")
-                    all_products.extend(exact_matches)
+                    products_by_id.update((product['idproduit'], product) for product in exact_matches)
                 else:
                     # Try partial match
-                    cursor.execute("SELECT * FROM produits_view3 WHERE TRIM(ean) LIKE %s", (f"%{ean}%",))
-                    partial_matches = cursor.fetchall()
+                    partial_matches = partial_by_ean.get(ean, [])
                     
                     if partial_matches:
                         print(f"  ✅ Found {len(partial_matches)} partial match(es)")
-                        all_products.extend(partial_matches)
+                        products_by_id.update((product['idproduit'], product) for product in partial_matches)
                     else:
                         print(f"  ❌ No matches found")
             
-            cursor.close()
-            
-            if all_products:
-                # Remove duplicates based on product ID
-                unique_products = []
-                seen_ids = set()
-                for product in all_products:
-                    if product['idproduit'] not in seen_ids:
-                        unique_products.append(product)
-                        seen_ids.add(product['idproduit'])
+            if products_by_id:
+                unique_products = list(products_by_id.values())
                 
                 print(f"\n📋 Search Results ({len(unique_products)} unique products):")
                 print("-" * 60)
@@ -1174,14 +1470,19 @@ class BazarchicDB:
                 
                 # Export to CSV
                 filename = f"ean_search_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-                df = pd.DataFrame(unique_products)
+                fieldnames = list(unique_products[0])
+                description_cols = [col for col in fieldnames if 'description' in col.lower()]
                 
-                # Clean HTML from description fields if they exist
-                for col in df.columns:
-                    if 'description' in col.lower():
-                        df[col] = df[col].apply(clean_html)
-                
-                df.to_csv(filename, index=False, encoding='utf-8')
+                with open_csv_output(filename) as f:
+                    writer = csv.DictWriter(f, fieldnames=fieldnames)
+                    writer.writeheader()
+                    
+                    for product in unique_products:
+                        # Clean HTML from description fields if they exist
+                        for col in description_cols:
+                            value = product[col]
+                            product[col] = clean_html(value) if isinstance(value, str) else ''
+                        writer.writerow(product)
                 
                 file_size = os.path.getsize(filename) / 1024
                 print(f"\n✅ Search results exported!")
@@ -1198,17 +1499,121 @@ class BazarchicDB:
             print(f"❌ Search error: {e}")
             return None, 0
 
+def parse_args():
+    """Command line options; without --action the interactive menu runs"""
+    parser = argparse.ArgumentParser(description="Bazarchic Products Database Tool")
+    parser.add_argument('--action', choices=[*(str(option) for option in range(1, 9)), '6p'],
+                        help="run this menu option once and exit instead of showing the menu")
+    parser.add_argument('--eans', help="comma-separated EAN codes for options 5 and 8")
+    parser.add_argument('--eans-file', help="text file with one EAN code per line for options 5 and 8")
+    parser.add_argument('--compress', action='store_true', help="gzip-compress the export of options 3, 6 and 8")
+    parser.add_argument('--yes', action='store_true',
+                        help="skip the confirmation of the full exports (options 3, 6 and 6p)")
+    return parser.parse_args()
+
 def main():
     """Main application"""
+    args = parse_args()
+    
+    def ask(prompt, scripted=''):
+        """Read an answer at the prompt, or take the scripted one under --action
+        (unanswered prompts get '', so confirmations default to no)"""
+        if args.action:
+            return scripted or ''
+        return input(prompt)
+    
     print("🚀 Bazarchic Products Database Tool")
     print("=" * 50)
     
+    if not args.action:
+        # Arrow-key editing and recall of previous answers, when available
+        try:
+            import readline
+        except ImportError:
+            readline = None
+        if readline:
+            try:
+                readline.read_history_file(HISTORY_FILE)
+            except OSError:
+                pass
+            
+            def save_history():
+                """Keep the answers for the next run; a home directory that
+                cannot be written to only means no history is kept"""
+                try:
+                    readline.write_history_file(HISTORY_FILE)
+                except OSError:
+                    pass
+            
+            atexit.register(save_history)
+    
     # Initialize database connection
     db = BazarchicDB()
     
     if not db.connection:
         print("❌ Cannot proceed without database connection")
-        return
+        sys.exit(1)
+    
+    # Scripted runs pick the EAN sub-option from the codes they were given
+    scripted_search = 'c' if args.eans_file else 'b' if args.eans else ''
+    
+    def prompt_eans(validate=False):
+        """EAN sub-menu of options 5 and 8: return (eans, rejected), eans being
+        an iterator over the chosen codes (a file is read as it is consumed) or
+        None once the problem has been reported
+        
+        With validate, codes not shaped like an EAN are skipped and collected
+        in rejected as eans is consumed."""
+        print("a. Search single EAN")
+        print("b. Search multiple EANs (comma-separated)")
+        print("c. Load EANs from file")
+        
+        search_choice = ask("Select search option (a/b/c): ", scripted_search).lower().strip()
+        rejected = []
+        
+        if search_choice == "a":
+            ean = ask("Enter EAN code: ").strip()
+            if not ean:
+                print("❌ No EAN code provided")
+                return None, rejected
+            eans = [ean]
+        
+        elif search_choice == "b":
+            eans_input = ask("Enter EAN codes (comma-separated): ", args.eans).strip()
+            if not eans_input:
+                print("❌ No EAN codes provided")
+                return None, rejected
+            eans = [ean for ean in (ean.strip() for ean in eans_input.split(',')) if ean]
+            before = len(eans)
+            eans = list(dict.fromkeys(eans))
+            if before != len(eans):
+                print(f"ℹ️ Deduplicated {before - len(eans)} EANs")
+        
+        elif search_choice == "c":
+            file_path = ask("Enter path to text file with EAN codes: ", args.eans_file).strip()
+            if not (file_path and os.path.isfile(file_path)):
+                print("❌ File not found")
+                return None, rejected
+            # Codes are streamed from the file into the search or export
+            eans = read_ean_file(file_path)
+        
+        else:
+            print("❌ Invalid search option")
+            return None, rejected
+        
+        if validate:
+            eans = filter_valid_eans(eans, rejected)
+        try:
+            eans = peek_iterable(eans)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"❌ Error reading file: {e}")
+            return None, rejected
+        if eans is None:
+            print("❌ No valid EAN codes provided")
+        return eans, rejected
+    
+    # Whether the last action failed, reported in the exit status of scripted runs
+    failed = False
     
     while True:
         print("\n📋 Available Operations:")
@@ -1218,34 +1623,57 @@ def main():
         print("4. Export sample products to CSV (10,000 products, original format)")
         print("5. Search products by EAN and save to CSV")
         print("6. 🎯 Export with COMPREHENSIVE HEADERS (your exact format)")
+        print("6p. 🎯 Export with COMPREHENSIVE HEADERS to Parquet (needs pyarrow)")
         print("7. 🎯 Export 10,000 products with COMPREHENSIVE HEADERS")
         print("8. 🎯 Search EAN with COMPREHENSIVE HEADERS")
         print("0. Exit")
         
+        failed = True
         try:
-            choice = input("\nSelect option (0-8): ").strip()
+            choice = ask("\nSelect option (0-8, 6p): ", args.action).strip()
             
             if choice == "0":
                 print("👋 Goodbye!")
+                failed = False
                 break
             
             elif choice == "1":
                 print("\n📄 Listing all database tables...")
-                tables = db.list_all_tables()
+                tables = db.list_all_tables(interactive=not args.action)
+                failed = not tables
                 
             elif choice == "2":
                 print("\n📄 Analyzing products table...")
                 info = db.get_products_table_info()
+                failed = info is None
                 
             elif choice == "3":
                 print("\n⚠️ WARNING: This will export ALL products (8M+)")
                 print("This may take several hours and create a very large file (1-3 GB)")
-                confirm = input("Are you sure? Type 'yes' to confirm: ").lower().strip()
+                confirm = "yes" if args.yes else ask("Are you sure? Type 'yes' to confirm: ").lower().strip()
                 
                 if confirm == "yes":
+                    # Offer to continue the most recent interrupted export
+                    resume_from = None
+                    # Only checkpoints whose partial file is still there can resume
+                    checkpoints = sorted(
+                        ckpt for ckpt in glob.glob("all_products_*.csv.ckpt")
+                        if os.path.exists(ckpt[:-len(".ckpt")] + PARTIAL_SUFFIX)
+                    )
+                    if checkpoints:
+                        previous = checkpoints[-1][:-len(".ckpt")]
+                        if ask(f"Resume interrupted export {previous}? (y/n): ").lower().strip() == "y":
+                            resume_from = previous
+                    
+                    compress = False
+                    if not resume_from:
+                        compress = ask("Compress the file with gzip (.csv.gz)? (y/n): ", args.compress and "y").lower().strip() == "y"
                     print("\n📄 Starting full export...")
-                    filename, count = db.export_all_products_csv(batch_size=50000)
+                    filename, count = db.export_all_products_csv(
+                        batch_size=50000, compress=compress, resume_from=resume_from
+                    )
                     
+                    failed = not filename
                     if filename:
                         print(f"🎉 Full export completed: {count:,} products exported")
                 else:
@@ -1258,159 +1686,97 @@ def main():
                     max_products=10000
                 )
                 
+                failed = not filename
                 if filename:
                     print(f"🎉 Sample export completed: {count:,} products exported")
             
             elif choice == "5":
                 print("\n🔍 EAN Search Options:")
-                print("a. Search single EAN")
-                print("b. Search multiple EANs (comma-separated)")
-                print("c. Load EANs from file")
-                
-                search_choice = input("Select search option (a/b/c): ").lower().strip()
-                
-                if search_choice == "a":
-                    ean = input("Enter EAN code: ").strip()
-                    if ean:
-                        filename, count = db.search_products_by_ean([ean])
-                    else:
-                        print("❌ No EAN code provided")
-                
-                elif search_choice == "b":
-                    eans_input = input("Enter EAN codes (comma-separated): ").strip()
-                    if eans_input:
-                        eans = [ean.strip() for ean in eans_input.split(',')]
-                        filename, count = db.search_products_by_ean(eans)
-                    else:
-                        print("❌ No EAN codes provided")
-                
-                elif search_choice == "c":
-                    file_path = input("Enter path to text file with EAN codes: ").strip()
-                    if file_path and os.path.exists(file_path):
-                        try:
-                            with open(file_path, 'r', encoding='utf-8') as f:
-                                eans = [line.strip() for line in f if line.strip()]
-                            
-                            if eans:
-                                print(f"✅ Loaded {len(eans)} EAN codes from file")
-                                filename, count = db.search_products_by_ean(eans)
-                            else:
-                                print("❌ No valid EAN codes found in file")
-                        except Exception as e:
-                            print(f"❌ Error reading file: {e}")
-                    else:
-                        print("❌ File not found")
-                else:
-                    print("❌ Invalid search option")
+                eans, _ = prompt_eans()
+                if eans:
+                    filename, count = db.search_products_by_ean(eans)
+                    failed = not filename
             
             elif choice == "6":
                 print("\n🎯 COMPREHENSIVE EXPORT with your exact headers!")
                 print("⚠️ WARNING: This will export ALL products with comprehensive data")
                 print("This creates a CSV with exactly 37 columns as you requested")
-                confirm = input("Continue? Type 'yes' to confirm: ").lower().strip()
+                confirm = "yes" if args.yes else ask("Continue? Type 'yes' to confirm: ").lower().strip()
                 
                 if confirm == "yes":
+                    compress = ask("Compress the file with gzip (.csv.gz)? (y/n): ", args.compress and "y").lower().strip() == "y"
                     print("\n📄 Starting comprehensive full export...")
-                    filename, count = db.export_comprehensive_csv()
+                    filename, count = db.export_comprehensive_csv(compress=compress)
                     
+                    failed = not filename
                     if filename:
                         print(f"🎉 Comprehensive export completed: {count:,} products exported")
                 else:
                     print("❌ Export cancelled")
             
+            elif choice == "6p":
+                print("\n🎯 COMPREHENSIVE EXPORT to Parquet (zstd compressed)")
+                print("⚠️ WARNING: This will export ALL products with comprehensive data")
+                confirm = "yes" if args.yes else ask("Continue? Type 'yes' to confirm: ").lower().strip()
+                
+                if confirm == "yes":
+                    print("\n📄 Starting comprehensive Parquet export...")
+                    filename, count = db.export_comprehensive_parquet()
+                    
+                    failed = not filename
+                    if filename:
+                        print(f"🎉 Comprehensive Parquet export completed: {count:,} products exported")
+                else:
+                    print("❌ Export cancelled")
+            
             elif choice == "7":
                 print("\n🎯 Exporting 10,000 products with COMPREHENSIVE HEADERS...")
                 filename, count = db.export_comprehensive_csv(limit=10000)
                 
+                failed = not filename
                 if filename:
                     print(f"🎉 Comprehensive sample export completed: {count:,} products exported")
             
             elif choice == "8":
                 print("\n🎯 EAN Search with COMPREHENSIVE HEADERS:")
-                print("a. Search single EAN")
-                print("b. Search multiple EANs (comma-separated)")
-                print("c. Load EANs from file")
-                
-                search_choice = input("Select search option (a/b/c): ").lower().strip()
-                
-                if search_choice == "a":
-                    ean = input("Enter EAN code: ").strip()
-                    if ean:
-                        result = db.export_comprehensive_csv(ean_filter=[ean])
-                        # Handle tuple return (filenames, counts)
-                        if result and result[0]:
-                            if isinstance(result[0], tuple):
-                                # Two files returned (found and not found)
-                                filenames, counts = result
-                                found_count, not_found_count = counts
-                                print(f"🎉 Export completed with {found_count} found and {not_found_count} not found")
-                            else:
-                                # Single file returned
-                                filename, count = result
-                                print(f"🎉 Found and exported {count} product(s)")
-                    else:
-                        print("❌ No EAN code provided")
-                
-                elif search_choice == "b":
-                    eans_input = input("Enter EAN codes (comma-separated): ").strip()
-                    if eans_input:
-                        eans = [ean.strip() for ean in eans_input.split(',')]
-                        result = db.export_comprehensive_csv(ean_filter=eans)
-                        # Handle tuple return (filenames, counts)
-                        if result and result[0]:
-                            if isinstance(result[0], tuple):
-                                # Two files returned (found and not found)
-                                filenames, counts = result
-                                found_count, not_found_count = counts
-                                print(f"🎉 Export completed with {found_count} found and {not_found_count} not found")
-                            else:
-                                # Single file returned
-                                filename, count = result
-                                print(f"🎉 Found and exported {count} product(s)")
-                    else:
-                        print("❌ No EAN codes provided")
-                
-                elif search_choice == "c":
-                    file_path = input("Enter path to text file with EAN codes: ").strip()
-                    if file_path and os.path.exists(file_path):
-                        try:
-                            with open(file_path, 'r', encoding='utf-8') as f:
-                                eans = [line.strip() for line in f if line.strip()]
-                            
-                            if eans:
-                                print(f"✅ Loaded {len(eans)} EAN codes from file")
-                                result = db.export_comprehensive_csv(ean_filter=eans)
-                                # Handle tuple return (filenames, counts)
-                                if result and result[0]:
-                                    if isinstance(result[0], tuple):
-                                        # Two files returned (found and not found)
-                                        filenames, counts = result
-                                        found_count, not_found_count = counts
-                                        print(f"🎉 Export completed with {found_count} found and {not_found_count} not found")
-                                    else:
-                                        # Single file returned
-                                        filename, count = result
-                                        print(f"🎉 Found and exported {count} product(s)")
-                            else:
-                                print("❌ No valid EAN codes found in file")
-                        except Exception as e:
-                            print(f"❌ Error reading file: {e}")
-                    else:
-                        print("❌ File not found")
-                else:
-                    print("❌ Invalid search option")
+                eans, rejected = prompt_eans(validate=True)
+                if eans:
+                    compress = ask("Compress the files with gzip (.csv.gz)? (y/n): ", args.compress and "y").lower().strip() == "y"
+                    result = db.export_comprehensive_csv(ean_filter=eans, compress=compress)
+                    failed = not (result and result[0])
+                    # Handle tuple return (filenames, counts)
+                    if result and result[0]:
+                        if isinstance(result[0], tuple):
+                            # Two files returned (found and not found)
+                            filenames, counts = result
+                            found_count, not_found_count = counts
+                            print(f"🎉 Export completed with {found_count} found and {not_found_count} not found")
+                        else:
+                            # Single file returned
+                            filename, count = result
+                            print(f"🎉 Found and exported {count} product(s)")
+                # Known only once a streamed file has been read through
+                if rejected:
+                    print(f"⚠️ Skipped {len(rejected)} invalid EAN(s): {', '.join(rejected[:10])}")
 
             else:
-                print("❌ Invalid option. Please select 0-8.")
+                print("❌ Invalid option. Please select 0-8 or 6p.")
         
         except KeyboardInterrupt:
             print("\n👋 Operation cancelled by user")
             break
         except Exception as e:
             print(f"❌ Unexpected error: {e}")
+        
+        # A scripted run performs its one action only
+        if args.action:
+            break
     
     # Close database connection
     db.close()
+    
+    if args.action and failed:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file